@@ -0,0 +1,113 @@
+"""
+Global admission control for the Russian Roulette server.
+
+Every create, join and connect is checked against live counters: rooms
+(live and hibernated), seats held by connected players, connected sockets
+and thread scheduling lag. Each check is a handful of comparisons, with no scan over
+rooms. Above the soft watermark new rooms are shed first. Joins and
+connects are only refused at the hard limit. Refusals carry a retry-after
+hint, so overload shows up as a clean rejection instead of runaway
+latency for everyone already playing.
+
+Lag is measured by a probe thread that sleeps for a fixed interval and
+records how late it wakes up. When the interpreter is saturated, every
+thread wakes late, this one included.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger('russian_roulette.admission')
+
+# Which resources each action is checked against, and at which watermark
+ACTION_CHECKS = {
+    'create_room': ('soft', ('rooms', 'players', 'sockets', 'lag_ms')),
+    'join_room': ('hard', ('players', 'sockets', 'lag_ms')),
+    'connect': ('hard', ('sockets', 'lag_ms'))
+}
+
+
+class AdmissionController:
+    """Soft/hard watermarks over live capacity counters"""
+
+    def __init__(self, count_rooms, count_players, count_sockets, max_rooms=0,
+                 max_players=0, max_sockets=0, max_lag_ms=0, soft_ratio=0.8,
+                 retry_after=5, probe_interval=0.5):
+        # Gauges are O(1) callables over live load (never running totals, so
+        # they fall again as rooms are reclaimed and players disconnect); a
+        # limit of 0 disables that resource
+        self.gauges = {
+            'rooms': count_rooms,
+            'players': count_players,
+            'sockets': count_sockets,
+            'lag_ms': lambda: self.lag_ms
+        }
+        self.limits = {
+            'rooms': max_rooms,
+            'players': max_players,
+            'sockets': max_sockets,
+            'lag_ms': max_lag_ms
+        }
+        self.soft_ratio = soft_ratio
+        self.retry_after = retry_after
+        self.probe_interval = probe_interval
+        self.lag_ms = 0.0
+        self.stats = {
+            'admitted': 0,
+            'shed_create_room': 0,
+            'rejected_join_room': 0,
+            'rejected_connect': 0
+        }
+        self._thread = None
+
+    def check(self, action):
+        """None if the action is admitted, else a rejection with retry_after"""
+        watermark, resources = ACTION_CHECKS[action]
+        ratio = self.soft_ratio if watermark == 'soft' else 1.0
+
+        for resource in resources:
+            limit = self.limits[resource]
+            if limit and self.gauges[resource]() >= limit * ratio:
+                self.stats[('shed_' if watermark == 'soft' else 'rejected_') + action] += 1
+                return {
+                    'code': 'overloaded',
+                    'resource': resource,
+                    'retry_after': self.retry_after,
+                    'message': f"Server is busy, please try again in {self.retry_after} seconds"
+                }
+
+        self.stats['admitted'] += 1
+        return None
+
+    def run(self):
+        """Lag probe loop"""
+        while True:
+            expected = time.monotonic() + self.probe_interval
+            time.sleep(self.probe_interval)
+            sample = max(0.0, time.monotonic() - expected) * 1000
+            # Rise immediately, decay over a few probes
+            self.lag_ms = max(sample, self.lag_ms * 0.5)
+
+    def start(self):
+        """Start the lag probe thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def get_stats(self):
+        """Current usage against the soft and hard limits"""
+        usage = {}
+        for resource, gauge in self.gauges.items():
+            limit = self.limits[resource]
+            usage[resource] = {
+                'value': gauge(),
+                'soft_limit': limit * self.soft_ratio if limit else None,
+                'hard_limit': limit or None
+            }
+        return {
+            'usage': usage,
+            'retry_after': self.retry_after,
+            **self.stats
+        }
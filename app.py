@@ -1,62 +1,354 @@
-from flask import Flask, render_template, request
-from flask_socketio import SocketIO, emit, join_room, leave_room
+from flask import Blueprint, Flask, Response, abort, current_app, render_template, request
+from flask_socketio import ConnectionRefusedError, SocketIO, emit, join_room, leave_room
+import atexit
+import functools
+from contextlib import contextmanager
+import hmac
+import logging
+import os
 import random
 import secrets
-import uuid
 from datetime import datetime
+from urllib.parse import urlencode
 import json
 import time
 import threading
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = secrets.token_hex(16)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+from admission import AdmissionController
+from assets import (ASSET_CACHE_CONTROL, MIMETYPES, PAGE_CACHE_CONTROL,
+                    AssetPipeline, CompressedEntry, PageCache)
+from broadcast import OutboundDispatcher, SpectatorHub
+from hibernation import RoomHibernator
+from profiler import Profiler, ProfilerBusy
+from roomids import RoomIdAllocator, normalize_room_id
+from events import EventLog
+from history import GameHistory
+from scheduler import DeadlineScheduler
+from tournament import TournamentManager
+from tracing import Tracer
+from transport import TRANSPORT_POLICIES, TransportMeter, client_options
+from config import get_config, load_environment
+
+logger = logging.getLogger('russian_roulette')
+
+def configure_logging(config):
+    """Apply the configured log level to the application loggers"""
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    logger.setLevel(config['LOG_LEVEL'].upper())
+
+# Created unbound so handlers can register at import time; create_app()
+# attaches it to an application
+socketio = SocketIO()
+
+# Page and debug routes, registered on the app by create_app()
+main = Blueprint('main', __name__)
 
 # Global game rooms storage
 game_rooms = {}
 
-# Room cleanup configuration
-ROOM_CLEANUP_INTERVAL = 300  # 5 minutes
-ROOM_INACTIVE_TIMEOUT = 900  # 15 minutes
+# Services configured by create_app()
+asset_pipeline = None  # content-hashed static bundles
+page_cache = None  # rendered pages, served with ETag revalidation
+outbound = None  # per-connection outbound queues
+spectator_hub = None  # coalesced fan-out for spectators
+turn_scheduler = None  # shared turn-timeout deadlines
+turn_timeout_settings = {'timeout': 0, 'action': 'skip', 'tournament_timeout': 30}
+
+# Connected sockets holding a seat, {socket_id: room_id}; a seat whose
+# socket is gone is kept for a reconnect but no longer counts as load
+seated_sockets = {}
+
+# Messages sent per join handshake, by handler
+handshake_stats = {
+    kind: {'joins': 0, 'reconnects': 0, 'messages_to_joiner': 0, 'messages_to_others': 0}
+    for kind in ('join_room', 'join_and_sync')
+}
+hibernator = None  # compressed storage for idle rooms
+game_history = None  # persistent results and leaderboard (None if disabled)
+event_log = None  # NDJSON game event stream (None if disabled)
+tracer = Tracer()  # sampled handler/engine spans (sampling off until configured)
+profiler = None  # on-demand sampling/tracemalloc sessions
+admission = None  # capacity watermarks for create/join/connect
+room_ids = None  # pooled, collision-checked room IDs
+tournaments = None  # tournament brackets spanning many rooms
+seating_deadlines = None  # tournament rooms waiting for their seeded players
+transport_meter = None  # Engine.IO handshake and long-polling counters
+upgrade_deadlines = None  # polling sessions expected to upgrade in time
+
+# Background threads started by start_background_services()
+background_threads = {}
+
+def create_app(config=None):
+    """Create and configure the application without starting any threads"""
+    global asset_pipeline, page_cache, outbound, spectator_hub, turn_scheduler
+    global turn_timeout_settings, hibernator, game_history, event_log, tracer, profiler
+    global admission, room_ids, tournaments, transport_meter, upgrade_deadlines
+    global seating_deadlines
+
+    # Settings are read from the environment (and .env) only from here on
+    load_environment()
+    config = config or get_config()
+    # A config class passed in directly has not been through get_config()
+    if hasattr(config, 'validate'):
+        config.validate()
+
+    app = Flask(__name__)
+    app.config.from_object(config)
+    configure_logging(app.config)
+
+    # The Engine.IO server and its async driver are only loaded here
+    transport_policy = app.config['SOCKETIO_TRANSPORT_POLICY']
+    socketio.init_app(
+        app,
+        async_mode=app.config['SOCKETIO_ASYNC_MODE'],
+        cors_allowed_origins=app.config['SOCKETIO_CORS_ALLOWED_ORIGINS'],
+        transports=TRANSPORT_POLICIES[transport_policy],
+        allow_upgrades=transport_policy == 'polling',
+        ping_interval=app.config['SOCKETIO_PING_INTERVAL'],
+        ping_timeout=app.config['SOCKETIO_PING_TIMEOUT'],
+        max_http_buffer_size=app.config['SOCKETIO_MAX_HTTP_BUFFER_SIZE'],
+        http_compression=app.config['SOCKETIO_HTTP_COMPRESSION'],
+        compression_threshold=app.config['SOCKETIO_COMPRESSION_THRESHOLD'],
+        logger=app.config['SOCKETIO_LOGGER'],
+        engineio_logger=app.config['ENGINEIO_LOGGER']
+    )
+    app.register_blueprint(main)
+
+    # Count handshakes and polling traffic in front of Engine.IO, and tell
+    # the client which transports to use
+    transport_meter = TransportMeter(app.wsgi_app)
+    app.wsgi_app = transport_meter
+    app.jinja_env.globals['socket_options'] = client_options(transport_policy)
+    upgrade_deadlines = DeadlineScheduler(on_upgrade_deadline)
+
+    # Bundles are built once per app, not on every page load
+    asset_pipeline = AssetPipeline(app.static_folder)
+    asset_pipeline.build()
+    app.jinja_env.globals['asset_url'] = asset_pipeline.url
+
+    page_cache = PageCache(max_entries=app.config['PAGE_CACHE_MAX_ENTRIES'])
+
+    tracer = Tracer(
+        sample_rate=app.config['TRACE_SAMPLE_RATE'],
+        buffer_size=app.config['TRACE_BUFFER_SIZE']
+    )
+
+    profiler = Profiler(
+        interval=app.config['PROFILE_INTERVAL'],
+        max_seconds=app.config['PROFILE_MAX_SECONDS']
+    )
+
+    outbound = OutboundDispatcher(
+        socketio,
+        max_queue=app.config['OUTBOUND_MAX_QUEUE'],
+        high_water=app.config['OUTBOUND_HIGH_WATER'],
+        workers=app.config['OUTBOUND_WORKERS'],
+        overflow_policy=app.config['OUTBOUND_OVERFLOW_POLICY'],
+        tracer=tracer
+    )
+    spectator_hub = SpectatorHub(outbound, tick_interval=app.config['SPECTATOR_TICK_INTERVAL'])
+
+    turn_scheduler = DeadlineScheduler(on_turn_timeout)
+    turn_timeout_settings = {
+        'timeout': app.config['TURN_TIMEOUT'],
+        'action': app.config['TURN_TIMEOUT_ACTION'],
+        'tournament_timeout': app.config['TOURNAMENT_TURN_TIMEOUT']
+    }
+
+    storage = app.config['HIBERNATION_STORAGE']
+    hibernator = RoomHibernator(
+        game_rooms,
+        MultiplayerRussianRoulette.from_snapshot,
+        idle_timeout=app.config['HIBERNATE_AFTER'],
+        storage=storage,
+        path=instance_file(app, app.config['HIBERNATION_FILE']) if storage == 'mmap' else None,
+        compress_level=app.config['HIBERNATION_COMPRESS_LEVEL']
+    )
+
+    room_ids = RoomIdAllocator(
+        lambda room_id: room_id in game_rooms or room_id in hibernator,
+        length=app.config['ROOM_ID_LENGTH'],
+        prefix=app.config['ROOM_ID_PREFIX'],
+        pool_size=app.config['ROOM_ID_POOL_SIZE']
+    )
+
+    seating_deadlines = DeadlineScheduler(on_seating_deadline)
+    tournaments = TournamentManager(
+        functools.partial(create_tournament_room, chamber_count=app.config['CHAMBER_COUNT'],
+                          seating_timeout=app.config['TOURNAMENT_SEATING_TIMEOUT']),
+        notify_tournament,
+        max_players=app.config['TOURNAMENT_MAX_PLAYERS'],
+        retention=app.config['TOURNAMENT_RETENTION']
+    )
+
+    admission = AdmissionController(
+        lambda: len(game_rooms) + len(hibernator.meta),
+        lambda: len(seated_sockets),
+        lambda: len(outbound.queues),
+        max_rooms=app.config['ADMISSION_MAX_ROOMS'],
+        max_players=app.config['ADMISSION_MAX_PLAYERS'],
+        max_sockets=app.config['ADMISSION_MAX_SOCKETS'],
+        max_lag_ms=app.config['ADMISSION_MAX_LAG_MS'],
+        soft_ratio=app.config['ADMISSION_SOFT_RATIO'],
+        retry_after=app.config['ADMISSION_RETRY_AFTER']
+    )
+
+    if app.config['HISTORY_ENABLED']:
+        game_history = GameHistory(
+            instance_file(app, app.config['HISTORY_DB']),
+            batch_size=app.config['HISTORY_BATCH_SIZE'],
+            flush_interval=app.config['HISTORY_FLUSH_INTERVAL'],
+            max_pending=app.config['HISTORY_MAX_PENDING']
+        )
+
+    if app.config['EVENTS_ENABLED']:
+        event_log = EventLog(
+            instance_file(app, app.config['EVENTS_DIR']),
+            buffer_size=app.config['EVENTS_BUFFER_SIZE'],
+            flush_interval=app.config['EVENTS_FLUSH_INTERVAL'],
+            max_file_bytes=app.config['EVENTS_MAX_FILE_BYTES'],
+            max_files=app.config['EVENTS_MAX_FILES']
+        )
+
+    return app
+
+def instance_file(app, filename):
+    """Path of a file in the app's instance folder, creating the folder"""
+    os.makedirs(app.instance_path, exist_ok=True)
+    return os.path.join(app.instance_path, filename)
+
+def traced(name, root=False):
+    """Time calls to the wrapped function as a span of the current trace
+
+    Socket handlers pass root=True, which starts a (sampled) trace; engine
+    methods and helpers only record a span when called inside one.
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            with (tracer.trace(name) if root else tracer.span(name)):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_event(event_type, room_id, **fields):
+    """Append a room event to the export stream (no I/O on the caller)"""
+    if event_log is not None:
+        event_log.emit(event_type, room_id, **fields)
+
+def start_background_services(app):
+    """Start room cleanup, outbound workers, spectator tick and turn timeouts"""
+    if 'cleanup' not in background_threads:
+        cleanup_thread = threading.Thread(target=cleanup_empty_rooms, args=(app,), daemon=True)
+        cleanup_thread.start()
+        background_threads['cleanup'] = cleanup_thread
+
+    if 'hibernation' not in background_threads and hibernator.idle_timeout > 0:
+        hibernation_thread = threading.Thread(target=hibernate_idle_rooms, args=(app,), daemon=True)
+        hibernation_thread.start()
+        background_threads['hibernation'] = hibernation_thread
+
+    room_ids.start()
+    outbound.start()
+    spectator_hub.start()
+    turn_scheduler.start()
+    seating_deadlines.start()
+    if app.config['SOCKETIO_TRANSPORT_POLICY'] == 'polling' and app.config['SOCKETIO_UPGRADE_DEADLINE'] > 0:
+        upgrade_deadlines.start()
+    if admission.limits['lag_ms']:
+        admission.start()
+
+    if game_history is not None:
+        game_history.start()
+        # Flush queued results when the server shuts down
+        atexit.register(game_history.stop)
+
+    if event_log is not None:
+        event_log.start()
+        atexit.register(event_log.flush)
+    return background_threads
+
+def room_occupied(room_id, socket_ids):
+    """Whether any of a room's seats is held by a connected socket"""
+    return any(seated_sockets.get(socket_id) == room_id for socket_id in socket_ids)
+
+def cleanup_empty_rooms(app):
+    """Periodically clean up abandoned rooms
+
+    A room is abandoned once none of its seats is held by a connected
+    socket (including rooms nobody ever joined) and it saw no activity for
+    the inactivity timeout.
+    """
+    inactive_timeout = app.config['ROOM_INACTIVE_TIMEOUT']
+    cleanup_interval = app.config['ROOM_CLEANUP_INTERVAL']
 
-def cleanup_empty_rooms():
-    """Periodically clean up empty or inactive rooms"""
     while True:
         try:
             current_time = time.time()
             rooms_to_remove = []
 
-            for room_id, game in game_rooms.items():
-                # Remove rooms that are empty for too long or inactive
-                if (len(game.players) == 0 and
-                    current_time - game.last_activity > ROOM_INACTIVE_TIMEOUT):
+            for room_id, game in list(game_rooms.items()):
+                # Joins change the players under the room lock
+                with game.lock:
+                    socket_ids = tuple(game.players)
+                # Remove rooms that are abandoned for too long
+                if (not room_occupied(room_id, socket_ids) and not tournaments.holds(room_id) and
+                    current_time - game.last_activity > inactive_timeout):
                     rooms_to_remove.append(room_id)
-                    print(f"Cleaning up inactive room: {room_id}")
+                    logger.info(f"Cleaning up inactive room: {room_id}")
+
+            # Hibernated rooms expire without being rehydrated
+            for room_id in hibernator.expired(current_time, inactive_timeout, room_occupied):
+                if tournaments.holds(room_id):
+                    # Seeded but not joined yet; the bracket still needs it
+                    continue
+                rooms_to_remove.append(room_id)
+                logger.info(f"Cleaning up hibernated room: {room_id}")
 
             # Remove the rooms
             for room_id in rooms_to_remove:
-                if room_id in game_rooms:
-                    del game_rooms[room_id]
+                game = game_rooms.get(room_id)
+                if game is not None:
+                    # Under the lock, so no handler is halfway through it
+                    with game.lock:
+                        game_rooms.pop(room_id, None)
+                hibernator.discard(room_id)
+                spectator_hub.drop_room(room_id)
+                turn_scheduler.cancel(room_id)
+                record_event('cleanup', room_id)
 
             if rooms_to_remove:
-                print(f"Cleaned up {len(rooms_to_remove)} inactive rooms")
+                logger.info(f"Cleaned up {len(rooms_to_remove)} inactive rooms")
+
+            evicted = tournaments.prune(current_time)
+            if evicted:
+                logger.info(f"Forgot {evicted} finished tournaments")
 
         except Exception as e:
-            print(f"Error in room cleanup: {str(e)}")
+            logger.error(f"Error in room cleanup: {str(e)}")
 
-        time.sleep(ROOM_CLEANUP_INTERVAL)
+        time.sleep(cleanup_interval)
 
-# Start cleanup thread
-cleanup_thread = threading.Thread(target=cleanup_empty_rooms, daemon=True)
-cleanup_thread.start()
+def hibernate_idle_rooms(app):
+    """Periodically move idle rooms into compressed hibernation storage"""
+    scan_interval = app.config['HIBERNATION_SCAN_INTERVAL']
+
+    while True:
+        try:
+            # Rooms waiting on a turn deadline are not idle
+            hibernator.hibernate_idle(can_hibernate=lambda game: game.turn_deadline is None)
+        except Exception as e:
+            logger.error(f"Error in room hibernation: {str(e)}")
+
+        time.sleep(scan_interval)
 
 class MultiplayerRussianRoulette:
-    def __init__(self, room_id):
+    def __init__(self, room_id, max_players=6, min_players=2, chamber_count=6):
         self.room_id = room_id
         self.players = {}  # {socket_id: player_data}
         self.player_order = []  # List of socket_ids in turn order
         self.current_player_index = 0
-        self.chamber_count = 6
+        self.chamber_count = chamber_count
         self.bullet_position = random.randint(1, self.chamber_count)
         self.current_chamber = 0
         self.is_game_over = False
@@ -65,10 +357,18 @@ class MultiplayerRussianRoulette:
         self.host = None
         self.created_at = datetime.now().isoformat()
         self.last_activity = time.time()
-        self.max_players = 6
-
-    def add_player(self, socket_id, player_name):
-        """Add a player to the game room"""
+        self.max_players = max_players
+        self.min_players = min_players
+        self.turn_number = 0  # Bumped whenever the turn moves to another player
+        self.idle_turns = 0  # Consecutive turns that ended by timeout
+        self.turn_deadline = None  # Wall-clock time the current turn expires
+        self.started_at = None  # When the current game was started
+        self.seat_tokens = {}  # {player_name: secret} needed to retake a seat
+        self.lock = threading.RLock()
+
+    @traced('game.add_player')
+    def add_player(self, socket_id, player_name, seat_token=None):
+        """Add a player to the game room, issuing the seat's secret"""
         if len(self.players) >= self.max_players:
             return False, "Room is full"
 
@@ -91,6 +391,8 @@ class MultiplayerRussianRoulette:
             'is_alive': True,
             'joined_at': datetime.now().isoformat()
         }
+        # Never part of the game state, which every player receives
+        self.seat_tokens[player_name] = seat_token or secrets.token_urlsafe(16)
 
         # Update activity timestamp
         self.last_activity = time.time()
@@ -98,8 +400,10 @@ class MultiplayerRussianRoulette:
         if not self.game_started:
             self.player_order.append(socket_id)
 
+        record_event('join', self.room_id, player=player_name, players=len(self.players))
         return True, "Player added successfully"
 
+    @traced('game.remove_player')
     def remove_player(self, socket_id):
         """Remove a player from the game"""
         if socket_id not in self.players:
@@ -109,15 +413,18 @@ class MultiplayerRussianRoulette:
 
         # Remove from players dict
         del self.players[socket_id]
+        self.seat_tokens.pop(player_name, None)
 
         # Remove from player order if game hasn't started
         if not self.game_started and socket_id in self.player_order:
             self.player_order.remove(socket_id)
 
-        # Handle host transfer
+        # Handle host transfer; the next player to join an empty room hosts it
         if socket_id == self.host and self.players:
             self.host = next(iter(self.players.keys()))
             self.players[self.host]['is_host'] = True
+        elif not self.players:
+            self.host = None
 
         # Adjust current player index if needed
         if self.game_started and socket_id in self.player_order:
@@ -132,30 +439,39 @@ class MultiplayerRussianRoulette:
             elif player_position == self.current_player_index:
                 # Current player left, move to next player
                 self.current_player_index = self.current_player_index % len(self.player_order)
+                self.turn_number += 1
             # If player_position > current_player_index, no adjustment needed
 
         # Update activity timestamp
         self.last_activity = time.time()
+        record_event('leave', self.room_id, player=player_name, players=len(self.players))
         return True, f"{player_name} left the game"
 
+    @traced('game.start_game')
     def start_game(self, socket_id):
         """Start the game (only host can start)"""
         if socket_id != self.host:
             return False, "Only the host can start the game"
 
-        if len(self.players) < 2:
-            return False, "Need at least 2 players to start"
+        if len(self.players) < self.min_players:
+            return False, f"Need at least {self.min_players} players to start"
 
         if self.game_started:
             return False, "Game already started"
 
         self.game_started = True
         self.reset_round()
+        self.started_at = time.time()
         # Ensure we have a valid current player
         if len(self.player_order) > 0:
             self.current_player_index = 0
+
+        record_event('start', self.room_id,
+                     players=[self.players[sid]['name'] for sid in self.player_order],
+                     chambers=self.chamber_count)
         return True, "Game started!"
 
+    @traced('game.reset_round')
     def reset_round(self):
         """Reset for a new round"""
         self.bullet_position = random.randint(1, self.chamber_count)
@@ -163,6 +479,9 @@ class MultiplayerRussianRoulette:
         self.current_player_index = 0
         self.is_game_over = False
         self.winner = None
+        self.turn_number += 1
+        self.idle_turns = 0
+        self.turn_deadline = None
 
         # Update activity timestamp
         self.last_activity = time.time()
@@ -171,6 +490,7 @@ class MultiplayerRussianRoulette:
         for player in self.players.values():
             player['is_alive'] = True
 
+    @traced('game.pull_trigger')
     def pull_trigger(self, socket_id):
         """Execute a trigger pull"""
         if not self.game_started:
@@ -192,6 +512,7 @@ class MultiplayerRussianRoulette:
 
         self.current_chamber += 1
         current_player = self.players[current_player_id]
+        self.turn_number += 1
 
         # Update activity timestamp
         self.last_activity = time.time()
@@ -211,6 +532,10 @@ class MultiplayerRussianRoulette:
             else:
                 self.winner = "No survivors"
 
+            record_event('trigger', self.room_id, player=current_player['name'],
+                         chamber=self.current_chamber, result='bullet',
+                         eliminated=current_player['name'], winner=self.winner)
+
             return True, f"{current_player['name']} got the bullet! Game Over!", {
                 "result": "bullet",
                 "eliminated_player": current_player['name'],
@@ -223,6 +548,9 @@ class MultiplayerRussianRoulette:
                 self.current_player_index = (self.current_player_index + 1) % len(self.player_order)
                 next_player = self.players[self.player_order[self.current_player_index]]
 
+                record_event('trigger', self.room_id, player=current_player['name'],
+                             chamber=self.current_chamber, result='empty',
+                             next_player=next_player['name'])
                 return True, f"{current_player['name']} is safe! {next_player['name']}'s turn.", {
                     "result": "empty",
                     "current_player": next_player['name'],
@@ -232,6 +560,51 @@ class MultiplayerRussianRoulette:
             else:
                 return False, "No players left in game", None
 
+    @traced('game.skip_turn')
+    def skip_turn(self):
+        """Pass the turn to the next player without pulling the trigger"""
+        if not self.game_started or self.is_game_over or not self.player_order:
+            return False, "No turn to skip", None
+
+        self.current_player_index %= len(self.player_order)
+        skipped_player = self.players[self.player_order[self.current_player_index]]
+        self.current_player_index = (self.current_player_index + 1) % len(self.player_order)
+        next_player = self.players[self.player_order[self.current_player_index]]
+        self.turn_number += 1
+
+        record_event('skip', self.room_id, player=skipped_player['name'],
+                     next_player=next_player['name'])
+
+        return True, f"{skipped_player['name']} ran out of time! {next_player['name']}'s turn.", {
+            "result": "skipped",
+            "skipped_player": skipped_player['name'],
+            "current_player": next_player['name'],
+            "current_player_id": next_player['id'],
+            "game_over": False
+        }
+
+    # Attributes that make up a room's state, in snapshot order
+    SNAPSHOT_FIELDS = (
+        'room_id', 'players', 'player_order', 'current_player_index',
+        'chamber_count', 'bullet_position', 'current_chamber', 'is_game_over',
+        'winner', 'game_started', 'host', 'created_at', 'last_activity',
+        'max_players', 'min_players', 'turn_number', 'idle_turns', 'turn_deadline',
+        'started_at', 'seat_tokens'
+    )
+
+    def to_snapshot(self):
+        """JSON-serializable copy of the room state (used for hibernation)"""
+        return {field: getattr(self, field) for field in self.SNAPSHOT_FIELDS}
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Rebuild a room from to_snapshot() output"""
+        game = cls(snapshot['room_id'])
+        for field in cls.SNAPSHOT_FIELDS:
+            setattr(game, field, snapshot[field])
+        return game
+
+    @traced('game.get_game_state')
     def get_game_state(self):
         """Get current game state"""
         current_player_data = None
@@ -250,25 +623,53 @@ class MultiplayerRussianRoulette:
             "current_chamber": self.current_chamber,
             "total_chambers": self.chamber_count,
             "host": self.host,
-            "player_count": len(self.players)
+            "player_count": len(self.players),
+            "max_players": self.max_players,
+            "min_players": self.min_players,
+            "turn_deadline": self.turn_deadline
         }
 
+def render_page(key, template, **context):
+    """Render a page once, then answer from the cache with ETag support"""
+    def render():
+        return render_template(template, **context)
+
+    if (current_app.config['PAGE_CACHE_ENABLED'] and
+            len(key) <= current_app.config['PAGE_CACHE_MAX_KEY_LENGTH']):
+        entry = page_cache.get_or_render(key, render)
+    else:
+        entry = CompressedEntry(render(), MIMETYPES['.html'])
+
+    return entry.response(request, PAGE_CACHE_CONTROL)
+
 # Flask Routes
-@app.route('/')
+@main.route('/')
 def index():
-    return render_template('index.html')
+    return render_page('/', 'index.html')
 
-@app.route('/room/<room_id>')
+@main.route('/room/<room_id>')
 def join_room_page(room_id):
-    return render_template('room.html', room_id=room_id)
+    room_id = normalize_room_id(room_id)
+    return render_page(f'/room/{room_id}', 'room.html', room_id=room_id)
 
-@app.route('/create')
+@main.route('/create')
 def create_room_page():
-    return render_template('create.html')
+    return render_page('/create', 'create.html')
 
-@app.route('/debug/rooms')
+@main.route('/assets/<path:filename>')
+def static_asset(filename):
+    """Serve a content-hashed bundle with long-lived cache headers"""
+    entry = asset_pipeline.get(filename)
+    if entry is None:
+        abort(404)
+    return entry.response(request, ASSET_CACHE_CONTROL)
+
+@main.route('/debug/rooms')
 def debug_rooms():
     """Debug endpoint to check room states"""
+    if not current_app.config['METRICS_ENABLED']:
+        abort(404)
+
     debug_info = {}
     for room_id, game in game_rooms.items():
         debug_info[room_id] = {
@@ -279,69 +680,539 @@ def debug_rooms():
             'is_game_over': game.is_game_over,
             'player_count': len(game.players),
             'current_chamber': game.current_chamber,
-            'last_activity': game.last_activity
+            'last_activity': game.last_activity,
+            'spectator_count': spectator_hub.spectator_count(room_id)
         }
     return {
         'total_rooms': len(game_rooms),
+        'hibernated_rooms': len(hibernator.meta),
         'rooms': debug_info,
+        'spectators': spectator_hub.get_stats(),
         'server_status': 'running'
     }
 
+@main.route('/debug/metrics')
+def debug_metrics():
+    """Debug endpoint exposing outbound queue and fan-out counters"""
+    if not current_app.config['METRICS_ENABLED']:
+        abort(404)
+
+    return {
+        'outbound': outbound.get_stats(),
+        'hibernation': hibernator.get_stats(),
+        'history': game_history.get_stats() if game_history is not None else None,
+        'events': event_log.get_stats() if event_log is not None else None,
+        'turn_scheduler': turn_scheduler.get_stats(),
+        'tracing': tracer.get_stats(),
+        'profiler': profiler.get_stats(),
+        'admission': admission.get_stats(),
+        'handshakes': {
+            kind: dict(stats, messages_per_handshake=(
+                (stats['messages_to_joiner'] + stats['messages_to_others']) /
+                (stats['joins'] + stats['reconnects'])
+                if stats['joins'] + stats['reconnects'] else 0.0))
+            for kind, stats in handshake_stats.items()
+        },
+        'room_ids': room_ids.get_stats(),
+        'transport': transport_stats(),
+        'tournaments': tournaments.get_stats(),
+        'seating_deadlines': seating_deadlines.get_stats(),
+        'spectators': spectator_hub.get_stats(),
+        'page_cache': page_cache.get_stats(),
+        'assets': asset_pipeline.get_stats()
+    }
+
+def transport_stats():
+    """Transport policy, live sessions per transport and polling counters"""
+    sessions = list(socketio.server.eio.sockets.values())
+    return {
+        'policy': current_app.config['SOCKETIO_TRANSPORT_POLICY'],
+        'sessions': len(sessions),
+        'sessions_on_polling': sum(1 for session in sessions if not session.upgraded),
+        'upgrade_deadline': current_app.config['SOCKETIO_UPGRADE_DEADLINE'],
+        **transport_meter.get_stats()
+    }
+
+@main.route('/api/leaderboard')
+def api_leaderboard():
+    """Top players, ordered by wins (default), games or survivals"""
+    if game_history is None:
+        abort(404)
+
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    order = request.args.get('order', 'wins')
+    return {
+        'order': order,
+        'players': game_history.leaderboard(limit=limit, order=order)
+    }
+
+@main.route('/api/stats')
+def api_stats():
+    """Totals across every recorded game"""
+    if game_history is None:
+        abort(404)
+    return game_history.summary()
+
+@main.route('/api/players/<player_name>')
+def api_player_stats(player_name):
+    """Aggregate statistics for a single player"""
+    if game_history is None:
+        abort(404)
+
+    stats = game_history.player_stats(player_name)
+    if stats is None:
+        abort(404)
+    return stats
+
+@main.route('/api/events/export')
+def api_events_export():
+    """Stream recorded game events as NDJSON, resuming after ?offset=<seq> (admin only)"""
+    require_admin()
+    if event_log is None:
+        abort(404)
+
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    return Response(event_log.export(offset), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-store'})
+
+@main.route('/debug/trace', methods=['GET', 'POST'])
+def debug_trace():
+    """Buffered trace spans in Chrome trace format; POST saves them to a file
+
+    Saving writes to the instance folder, so it is admin only.
+    """
+    if not current_app.config['METRICS_ENABLED']:
+        abort(404)
+
+    if request.method == 'GET':
+        return tracer.chrome_trace()
+
+    require_admin()
+
+    path = os.path.join(instance_file(current_app, current_app.config['TRACE_DIR']),
+                        f"trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return {'path': path, 'spans': tracer.export(path)}
+
+def require_admin():
+    """Abort unless the request carries the configured admin token"""
+    token = current_app.config['ADMIN_TOKEN']
+    if not token:
+        # Admin endpoints do not exist without a token
+        abort(404)
+
+    supplied = request.headers.get('X-Admin-Token', '')
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        supplied = authorization[len('Bearer '):]
+    if not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+        abort(403)
+
+@main.route('/debug/profile', methods=['POST'])
+def debug_profile():
+    """Profile the live server for ?seconds=N (admin only)
+
+    mode=wall or mode=cpu returns collapsed stacks of every thread;
+    mode=memory returns the tracemalloc allocation growth over the window.
+    """
+    require_admin()
+
+    mode = request.args.get('mode', 'wall')
+    seconds = request.args.get('seconds', 10, type=float)
+    try:
+        if mode == 'memory':
+            rooms_before = len(game_rooms)
+            result = profiler.memory_diff(
+                seconds,
+                limit=min(max(request.args.get('limit', 30, type=int), 1), 500),
+                group_by=request.args.get('group_by', 'lineno'),
+                frames=current_app.config['PROFILE_TRACEMALLOC_FRAMES']
+            )
+            result['rooms'] = {
+                'before': rooms_before,
+                'after': len(game_rooms),
+                'hibernated': len(hibernator.meta)
+            }
+            return result
+
+        stacks = profiler.sample(seconds, mode)
+    except ProfilerBusy as e:
+        return {'error': str(e)}, 409
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+    filename = f"profile-{mode}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded"
+    return Response(stacks, mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@main.route('/api/tournaments', methods=['POST'])
+def api_create_tournament():
+    """Seed a tournament from {"name", "players": [...], "room_size"} (admin only)"""
+    require_admin()
+
+    data = request.get_json(silent=True) or {}
+    players = data.get('players')
+    if not isinstance(players, list) or not all(isinstance(name, str) for name in players):
+        return {'error': 'players must be a list of names'}, 400
+
+    rejection = admission.check('create_room')
+    if rejection is not None:
+        return rejection, 503, {'Retry-After': str(rejection['retry_after'])}
+
+    try:
+        room_size = int(data.get('room_size', current_app.config['TOURNAMENT_ROOM_SIZE']))
+        room_size = min(room_size, current_app.config['MAX_PLAYERS'])
+        tournament = tournaments.create(str(data.get('name', '')).strip()[:50], players, room_size)
+    except (TypeError, ValueError) as e:
+        return {'error': str(e)}, 400
+    # The only place the players' secrets are handed out. Each player opens
+    # their invite, which follows them from room to room (byes included)
+    invites = {name: '/?' + urlencode({'tournament': tournament.id, 'player': name, 'seat': token})
+               for name, token in tournament.seat_tokens.items()}
+    return {**tournament.summary(), 'seat_tokens': tournament.seat_tokens, 'invites': invites}, 201
+
+@main.route('/api/tournaments/<tournament_id>')
+def api_tournament(tournament_id):
+    """Bracket progress and current room assignments"""
+    tournament = tournaments.get(tournament_id.upper())
+    if tournament is None:
+        abort(404)
+    return tournament.summary()
+
+@traced('get_room')
+def get_room(room_id):
+    """Look up a room, transparently rehydrating it if it is hibernated"""
+    game = game_rooms.get(room_id)
+    if game is None and room_id in hibernator:
+        game = hibernator.rehydrate(room_id)
+    return game
+
+@contextmanager
+def locked_room(room_id):
+    """Look up a room and hold its lock while it is the live game object
+
+    The hibernator snapshots and drops rooms under their lock, so a game
+    fetched just before it was hibernated is fetched again (rehydrating
+    it) instead of being changed after its snapshot was taken. Yields
+    None if the room does not exist.
+    """
+    while True:
+        game = get_room(room_id)
+        if game is None:
+            yield None
+            return
+        with game.lock:
+            if game_rooms.get(room_id) is game:
+                yield game
+                return
+
+@traced('broadcast_to_room')
+def broadcast_to_room(game, event, payload):
+    """Queue an event for every player seated in a room"""
+    outbound.send_many(list(game.players), event, payload)
+
+@traced('record_game_result')
+def record_game_result(game, result_data):
+    """Hand a finished game to the history writer (never blocks)"""
+    if game_history is None or not result_data.get('game_over'):
+        return
+
+    game_history.record({
+        'room_id': game.room_id,
+        'winner': result_data['winner'],
+        'eliminated_player': result_data['eliminated_player'],
+        'players': [game.players[socket_id]['name'] for socket_id in game.player_order
+                    if socket_id in game.players],
+        'rounds': game.current_chamber,
+        'chambers': game.chamber_count,
+        'started_at': game.started_at,
+        'ended_at': time.time()
+    })
+
+@traced('arm_turn_deadline')
+def arm_turn_deadline(game):
+    """(Re-)arm the room's turn deadline after the turn has changed"""
+    timeout = turn_timeout_settings['timeout']
+    if timeout <= 0 and tournaments.holds(game.room_id):
+        # A bracket only advances if absent players are pulled for
+        timeout = turn_timeout_settings['tournament_timeout']
+    if timeout <= 0 or not game.game_started or game.is_game_over or not game.player_order:
+        # Nothing to time out
+        game.turn_deadline = None
+        turn_scheduler.cancel(game.room_id)
+        return
+
+    game.turn_deadline = time.time() + timeout
+    turn_scheduler.arm(game.room_id, timeout, game.turn_number)
+
+def end_idle_game(game):
+    """End a game nobody played for a full round
+
+    Called with the room lock held. The room goes back to the lobby and
+    the seats of players whose socket is gone are freed, so an abandoned
+    room empties and cleanup reclaims it; connected players keep their
+    seats. Returns the number of released seats.
+    """
+    gone = [socket_id for socket_id in game.player_order
+            if seated_sockets.get(socket_id) != game.room_id]
+    game.reset_round()
+    game.game_started = False
+    for socket_id in gone:
+        game.remove_player(socket_id)
+    record_event('reset', game.room_id, reason='idle')
+    return len(gone)
+
+def create_tournament_room(room_size, chamber_count, seating_timeout):
+    """Register an empty room for a tournament round and return its ID
+
+    Seeded players have seating_timeout seconds to take their seats.
+    """
+    while True:
+        room_id = room_ids.allocate()
+        game = MultiplayerRussianRoulette(
+            room_id,
+            max_players=room_size,
+            min_players=2,
+            chamber_count=chamber_count
+        )
+        if game_rooms.setdefault(room_id, game) is game:
+            record_event('create', room_id, tournament=True)
+            seating_deadlines.arm(room_id, seating_timeout)
+            return room_id
+
+def notify_tournament(tournament, event, payload):
+    """Send one round announcement to every seated participant"""
+    outbound.send_many(list(tournament.sockets.values()), event, payload)
+
+@traced('advance_tournament')
+def advance_tournament(game, result_data):
+    """Move the survivors of a finished tournament room on to the next round"""
+    if not result_data or not result_data.get('game_over') or not tournaments.holds(game.room_id):
+        return
+    tournaments.room_finished(
+        game.room_id,
+        {player['name'] for player in game.players.values()},
+        result_data['eliminated_player']
+    )
+
+def start_tournament_room(game, force=False):
+    """Start a tournament room as soon as every reserved seat is taken
+
+    With force, start with whoever is seated (the seating deadline passed).
+    """
+    reserved = tournaments.reserved(game.room_id)
+    if reserved is None or game.game_started or (len(game.players) < len(reserved) and not force):
+        return
+
+    with game.lock:
+        if game.game_started:
+            return
+        success, message = game.start_game(game.host)
+        if not success:
+            logger.warning(f"Error starting tournament room {game.room_id}: {message}")
+            return
+        seating_deadlines.cancel(game.room_id)
+        arm_turn_deadline(game)
+        game_state = game.get_game_state()
+
+    broadcast_to_room(game, 'game_started', {
+        'message': message,
+        'game_state': game_state
+    })
+    spectator_hub.publish(game.room_id, game_state)
+
+@traced('seating_deadline', root=True)
+def on_seating_deadline(room_id, data):
+    """Stop a tournament room from waiting forever for no-shows
+
+    Start it with whoever took their seat, or finish it right away when
+    too few did: the seated player (if any) advances and the no-shows are
+    out, as in any finished room.
+    """
+    if not tournaments.holds(room_id):
+        return
+
+    with locked_room(room_id) as game:
+        if game is None or game.game_started:
+            return
+        seated = {player['name'] for player in game.players.values()}
+        if len(seated) >= game.min_players:
+            logger.info(f"Seating deadline passed in tournament room {room_id}, starting with {len(seated)} players")
+            start_tournament_room(game, force=True)
+            return
+
+    logger.info(f"Seating deadline passed in tournament room {room_id} with {len(seated)} seated, finishing it")
+    record_event('seating_timeout', room_id, seated=sorted(seated))
+    tournaments.room_finished(room_id, seated, None)
+
+@traced('turn_timeout', root=True)
+def on_turn_timeout(room_id, turn_number):
+    """Skip or auto-pull for a player whose turn deadline passed"""
+    game = game_rooms.get(room_id)
+    if game is None:
+        return
+
+    with game.lock:
+        if game.turn_number != turn_number:
+            # The turn moved on while this deadline was in flight
+            return
+
+        game.idle_turns += 1
+        # A tournament room cannot wait for an absent player forever
+        if turn_timeout_settings['action'] == 'pull' or tournaments.holds(room_id):
+            current_player_id = game.player_order[game.current_player_index % len(game.player_order)]
+            success, message, result_data = game.pull_trigger(current_player_id)
+            if success:
+                record_game_result(game, result_data)
+            event = 'trigger_result'
+        else:
+            success, message, result_data = game.skip_turn()
+            event = 'turn_timeout'
+
+        if not success:
+            logger.warning(f"Error handling turn timeout in room {room_id}: {message}")
+            return
+
+        released = None
+        if (not game.is_game_over and game.idle_turns >= len(game.player_order) and
+                not tournaments.holds(room_id)):
+            # A full round passed with nobody playing
+            released = end_idle_game(game)
+
+        arm_turn_deadline(game)
+        game_state = game.get_game_state()
+
+    logger.info(f"Turn timed out in room {room_id}: {message}")
+    if released is not None:
+        logger.info(f"Ended idle game in room {room_id}, released {released} seats")
+        broadcast_to_room(game, 'game_reset', {
+            'message': 'The game ended because nobody played for a full round',
+            'game_state': game_state
+        })
+    else:
+        broadcast_to_room(game, event, {
+            'message': message,
+            'result_data': result_data,
+            'game_state': game_state
+        })
+    spectator_hub.publish(room_id, game_state)
+    advance_tournament(game, result_data)
+
+def on_upgrade_deadline(sid, data):
+    """Disconnect a session that is still long-polling after the upgrade deadline
+
+    The client is told to come back over WebSocket only (see base.js), so a
+    session that cannot upgrade stops costing a request per poll.
+    """
+    eio_sid = socketio.server.manager.eio_sid_from_sid(sid, '/')
+    if eio_sid is None:
+        return
+    try:
+        transport = socketio.server.eio.transport(eio_sid)
+    except KeyError:
+        # Disconnected while the deadline was in flight
+        return
+
+    if transport == 'polling':
+        transport_meter.add('missed_upgrade_deadline')
+        logger.info(f"Disconnecting {sid}, still long-polling after the upgrade deadline")
+        # Queued ahead of the disconnect packet, so the client sees it first
+        socketio.emit('upgrade_required', {'transports': ['websocket']}, to=sid)
+        socketio.server.disconnect(sid, namespace='/')
+
 # Socket.IO Events
 @socketio.on('connect')
-def on_connect():
-    print(f"Client connected: {request.sid}")
-    print(f"Current active rooms: {list(game_rooms.keys())}")
+@traced('connect', root=True)
+def on_connect(auth=None):
+    rejection = admission.check('connect')
+    if rejection is not None:
+        logger.warning(f"Refusing connection {request.sid}: {rejection['resource']} at capacity")
+        raise ConnectionRefusedError(rejection)
+
+    logger.debug(f"Client connected: {request.sid}")
+    outbound.register(request.sid)
+
+    upgrade_deadline = current_app.config['SOCKETIO_UPGRADE_DEADLINE']
+    if current_app.config['SOCKETIO_TRANSPORT_POLICY'] == 'polling' and upgrade_deadline > 0:
+        upgrade_deadlines.arm(request.sid, upgrade_deadline)
+    logger.debug(f"Current active rooms: {list(game_rooms.keys())}")
 
 @socketio.on('disconnect')
+@traced('disconnect', root=True)
 def on_disconnect():
-    print(f"Client disconnected: {request.sid}")
+    logger.debug(f"Client disconnected: {request.sid}")
+
+    # Spectators hold no seat, so they can be forgotten right away
+    spectator_hub.remove_spectator(request.sid)
+    outbound.unregister(request.sid)
+    upgrade_deadlines.cancel(request.sid)
+    # The seat itself is kept for a reconnect
+    seated_sockets.pop(request.sid, None)
 
     # Don't immediately remove players on disconnect - they might be navigating
     # The cleanup will handle truly disconnected players after the timeout period
-    print(f"Client {request.sid} disconnected - keeping in rooms for potential reconnection")
+    logger.debug(f"Client {request.sid} disconnected - keeping in rooms for potential reconnection")
 
 @socketio.on('create_room')
+@traced('create_room', root=True)
 def on_create_room(data):
     try:
-        room_id = str(uuid.uuid4())[:8].upper()  # Generate short room ID, uppercase
+        # New rooms are the first thing shed under load
+        rejection = admission.check('create_room')
+        if rejection is not None:
+            logger.warning(f"Shedding create_room from {request.sid}: {rejection['resource']} over soft limit")
+            emit('error', rejection)
+            return
+
+        room_id = room_ids.allocate()
         player_name = data.get('player_name', '').strip()
 
-        print(f"Creating room request from {request.sid}: name='{player_name}'")
+        logger.debug(f"Creating room request from {request.sid}: name='{player_name}'")
 
         if not player_name:
-            print(f"Error: No player name provided")
+            logger.warning(f"Error: No player name provided")
             emit('error', {'message': 'Player name is required'})
             return
 
         if len(player_name) > 20:
-            print(f"Error: Player name too long")
+            logger.warning(f"Error: Player name too long")
             emit('error', {'message': 'Player name must be 20 characters or less'})
             return
 
         # Create new game room
-        game = MultiplayerRussianRoulette(room_id)
+        game = MultiplayerRussianRoulette(
+            room_id,
+            max_players=current_app.config['MAX_PLAYERS'],
+            min_players=current_app.config['MIN_PLAYERS'],
+            chamber_count=current_app.config['CHAMBER_COUNT']
+        )
         success, message = game.add_player(request.sid, player_name)
 
         if not success:
-            print(f"Error adding player to room: {message}")
+            logger.warning(f"Error adding player to room: {message}")
             emit('error', {'message': message})
             return
 
-        # Store the game room
-        game_rooms[room_id] = game
-        print(f"Room {room_id} stored in game_rooms. Total rooms: {len(game_rooms)}")
+        # Store the game room; setdefault keeps a concurrent create of the
+        # same ID from overwriting it
+        if game_rooms.setdefault(room_id, game) is not game:
+            logger.error(f"Room ID {room_id} was taken while creating the room")
+            emit('error', {'message': 'Failed to create room, please try again'})
+            return
+        seated_sockets[request.sid] = room_id
+        record_event('create', room_id, player=player_name)
+        logger.debug(f"Room {room_id} stored in game_rooms. Total rooms: {len(game_rooms)}")
 
         # Join the socket room
         join_room(room_id)
-        print(f"Socket {request.sid} joined room {room_id}")
+        logger.debug(f"Socket {request.sid} joined room {room_id}")
 
-        print(f"Room creator {request.sid} joined Socket.IO room {room_id}")
+        logger.debug(f"Room creator {request.sid} joined Socket.IO room {room_id}")
 
         # Get game state
         game_state = game.get_game_state()
-        print(f"Game state for room {room_id}: {game_state}")
-        print(f"Host is: {game.host}, Creator socket: {request.sid}")
+        logger.debug(f"Game state for room {room_id}: {game_state}")
+        logger.debug(f"Host is: {game.host}, Creator socket: {request.sid}")
 
         # Send success response with URL for navigation
         emit('room_created', {
@@ -351,39 +1222,41 @@ def on_create_room(data):
             'redirect_url': f'/room/{room_id}',
             'is_host': True,
             'creator_name': player_name,
-            'creator_socket': request.sid
+            'creator_socket': request.sid,
+            'seat_token': game.seat_tokens[player_name]
         })
 
-        print(f"Room {room_id} created successfully by {player_name} ({request.sid}) as host")
+        logger.info(f"Room {room_id} created successfully by {player_name} ({request.sid}) as host")
 
     except Exception as e:
-        print(f"Error creating room: {str(e)}")
+        logger.error(f"Error creating room: {str(e)}")
         emit('error', {'message': f'Failed to create room: {str(e)}'})
 
-@socketio.on('join_room')
-def on_join_room(data):
-    try:
-        room_id = data.get('room_id', '').strip().upper()
-        player_name = data.get('player_name', '').strip()
+def seat_player(room_id, player_name, seat_token=''):
+    """Validate a join and seat the player, reusing their seat on reconnect
 
-        print(f"Join room request: room_id='{room_id}', player_name='{player_name}', sid={request.sid}")
-
-        if not room_id or not player_name:
-            print(f"Error: Missing room_id or player_name")
-            emit('error', {'message': 'Room ID and player name are required'})
-            return
+    Retaking a seat needs the secret handed out when it was first taken
+    (and a tournament seat needs the player's tournament secret), so
+    knowing a name is not enough to take over someone's turn or host
+    rights. Returns (game, error, reconnected); error is an 'error'
+    payload and game is None when the join was refused.
+    """
+    if not room_id or not player_name:
+        logger.warning(f"Error: Missing room_id or player_name")
+        return None, {'message': 'Room ID and player name are required'}, False
 
-        if len(player_name) > 20:
-            print(f"Error: Player name too long")
-            emit('error', {'message': 'Player name must be 20 characters or less'})
-            return
+    if len(player_name) > 20:
+        logger.warning(f"Error: Player name too long")
+        return None, {'message': 'Player name must be 20 characters or less'}, False
 
-        if room_id not in game_rooms:
-            print(f"Error: Room {room_id} not found. Available rooms: {list(game_rooms.keys())}")
-            emit('error', {'message': 'Room not found or has expired'})
-            return
+    with locked_room(room_id) as game:
+        if game is None:
+            logger.warning(f"Error: Room {room_id} not found. Available rooms: {list(game_rooms.keys())}")
+            return None, {'message': 'Room not found or has expired'}, False
 
-        game = game_rooms[room_id]
+        reserved = tournaments.reserved(room_id)
+        if reserved is not None and player_name not in reserved:
+            return None, {'message': 'This room is reserved for tournament players'}, False
 
         # Update room activity
         game.last_activity = time.time()
@@ -395,8 +1268,12 @@ def on_join_room(data):
                 existing_player_socket = socket_id
                 break
 
+        if existing_player_socket and not seat_token_matches(seat_token, game.seat_tokens.get(player_name)):
+            logger.warning(f"Refusing to hand {player_name}'s seat in room {room_id} to {request.sid}")
+            return None, {'message': 'Player name already taken'}, False
+
         if existing_player_socket:
-            print(f"Player {player_name} reconnecting with new socket ID {request.sid} (old: {existing_player_socket})")
+            logger.debug(f"Player {player_name} reconnecting with new socket ID {request.sid} (old: {existing_player_socket})")
 
             # Get the existing player data
             existing_player = game.players[existing_player_socket]
@@ -417,225 +1294,429 @@ def on_join_room(data):
             # Update host reference if this was the host
             if was_host:
                 game.host = request.sid
-                print(f"Updated host to new socket ID: {request.sid}")
+                logger.info(f"Updated host to new socket ID: {request.sid}")
 
             # Update player order if game has started
             if existing_player_socket in game.player_order:
                 index = game.player_order.index(existing_player_socket)
                 game.player_order[index] = request.sid
 
-            # Join the socket room
-            join_room(room_id)
+            if seated_sockets.get(existing_player_socket) == room_id:
+                del seated_sockets[existing_player_socket]
+            record_event('reconnect', room_id, player=player_name)
+            reconnected = True
+        else:
+            # Reconnects reuse their seat; only new seats count against capacity
+            rejection = admission.check('join_room')
+            if rejection is not None:
+                logger.warning(f"Rejecting join to room {room_id} from {request.sid}: {rejection['resource']} at capacity")
+                return None, rejection, False
+
+            tournament_token = None
+            if reserved is not None and game.game_started:
+                # Started without them when the seating deadline passed
+                return None, {'message': 'This tournament round has already started'}, False
+            if reserved is not None:
+                tournament_token = tournaments.seat_token(room_id, player_name)
+                if not seat_token_matches(seat_token, tournament_token):
+                    return None, {'message': 'This seat is reserved for another tournament player'}, False
+
+            # Add the new player (first time joining)
+            success, message = game.add_player(request.sid, player_name, tournament_token)
+            if not success:
+                logger.warning(f"Error adding player to room {room_id}: {message}")
+                return None, {'message': message}, False
+            reconnected = False
+
+        seated_sockets[request.sid] = room_id
+
+    # Join the socket room
+    spectator_hub.remove_spectator(request.sid)
+    join_room(room_id)
+    logger.debug(f"Player {player_name} joined Socket.IO room {room_id}")
+
+    if reserved is not None:
+        tournaments.seated(room_id, player_name, request.sid)
+    return game, None, reconnected
+
+def seat_token_matches(given, expected):
+    """Constant-time check of a client's seat secret"""
+    if not given or not expected:
+        return False
+    return hmac.compare_digest(given.encode('utf-8'), expected.encode('utf-8'))
+
+def notify_seated(game, player_name, game_state, reconnected):
+    """Tell everyone else in the room about a join; returns the message count
+
+    A reconnect does not change who is playing, so the others only get a
+    coalesced state update (a reconnect storm collapses into the latest
+    one per connection); a new player is announced.
+    """
+    others = [socket_id for socket_id in game.players if socket_id != request.sid]
+    if reconnected:
+        outbound.send_many(others, 'game_state_update', {'game_state': game_state})
+    else:
+        outbound.send_many(others, 'player_joined', {
+            'message': f"{player_name} joined the game!",
+            'game_state': game_state
+        })
+    spectator_hub.publish(game.room_id, game_state)
+    return len(others)
 
-            # Send welcome back message
-            emit('player_joined', {
-                'message': f"Welcome back, {player_name}!",
-                'game_state': game.get_game_state()
-            })
+def count_handshake(kind, reconnected, to_joiner, to_others):
+    """Record how many messages one join handshake cost"""
+    stats = handshake_stats[kind]
+    stats['reconnects' if reconnected else 'joins'] += 1
+    stats['messages_to_joiner'] += to_joiner
+    stats['messages_to_others'] += to_others
 
-            # Also notify other players about the reconnection
-            socketio.emit('player_joined', {
-                'message': f"{player_name} reconnected!",
-                'game_state': game.get_game_state()
-            }, to=room_id)
+@socketio.on('join_room')
+@traced('join_room', root=True)
+def on_join_room(data):
+    """Join (or rejoin) a room; the state arrives as a player_joined event
 
-            print(f"{player_name} ({request.sid}) successfully reconnected to room {room_id}")
-            return
+    Kept for clients that do not use the join_and_sync handshake.
+    """
+    try:
+        room_id = normalize_room_id(data.get('room_id', ''))
+        player_name = data.get('player_name', '').strip()
+        seat_token = str(data.get('seat_token') or '')
 
-        # Add the new player (first time joining)
-        success, message = game.add_player(request.sid, player_name)
+        logger.debug(f"Join room request: room_id='{room_id}', player_name='{player_name}', sid={request.sid}")
 
-        if not success:
-            print(f"Error adding player to room {room_id}: {message}")
-            emit('error', {'message': message})
+        game, error, reconnected = seat_player(room_id, player_name, seat_token)
+        if error is not None:
+            emit('error', error)
             return
 
-        # Join the socket room
-        join_room(room_id)
-        print(f"Player {player_name} joined Socket.IO room {room_id}")
+        game_state = game.get_game_state()
+        message = f"Welcome back, {player_name}!" if reconnected else f"{player_name} joined the game!"
+        outbound.send(request.sid, 'player_joined', {
+            'message': message,
+            'game_state': game_state,
+            'seat_token': game.seat_tokens.get(player_name)
+        })
+        to_others = notify_seated(game, player_name, game_state, reconnected)
+        count_handshake('join_room', reconnected, 1, to_others)
+        start_tournament_room(game)
 
-        # Get updated game state after adding player
-        updated_game_state = game.get_game_state()
+        logger.info(f"{player_name} ({request.sid}) successfully {'reconnected to' if reconnected else 'joined'} room {room_id}")
 
-        # Notify all players in the room (including the joiner)
-        socketio.emit('player_joined', {
-            'message': f"{player_name} joined the game!",
-            'game_state': updated_game_state
-        }, to=room_id)
-        print(f"Broadcasted 'player_joined' to room {room_id}")
+    except Exception as e:
+        logger.error(f"Error joining room: {str(e)}")
+        emit('error', {'message': f'Failed to join room: {str(e)}'})
 
-        print(f"{player_name} ({request.sid}) successfully joined room {room_id}")
+@socketio.on('join_and_sync')
+@traced('join_and_sync', root=True)
+def on_join_and_sync(data):
+    """Seat the player, join the channel and return the state in the ack
+
+    One round trip replaces join_room plus the follow-up get_game_state,
+    which matters when every client reconnects at once after a deploy.
+    """
+    try:
+        room_id = normalize_room_id(data.get('room_id', ''))
+        player_name = data.get('player_name', '').strip()
+        seat_token = str(data.get('seat_token') or '')
+
+        logger.debug(f"Join and sync request: room_id='{room_id}', player_name='{player_name}', sid={request.sid}")
+
+        game, error, reconnected = seat_player(room_id, player_name, seat_token)
+        if error is not None:
+            return {'success': False, **error}
+
+        # A full tournament room starts now, so the ack already has the
+        # started game
+        start_tournament_room(game)
+        game_state = game.get_game_state()
+        to_others = notify_seated(game, player_name, game_state, reconnected)
+        count_handshake('join_and_sync', reconnected, 1, to_others)
+
+        logger.info(f"{player_name} ({request.sid}) {'resynced with' if reconnected else 'joined'} room {room_id}")
+        return {
+            'success': True,
+            'message': f"Welcome back, {player_name}!" if reconnected else f"{player_name} joined the game!",
+            'reconnected': reconnected,
+            'player_id': request.sid,
+            'seat_token': game.seat_tokens.get(player_name),
+            'game_state': game_state
+        }
 
     except Exception as e:
-        print(f"Error joining room: {str(e)}")
-        emit('error', {'message': f'Failed to join room: {str(e)}'})
+        logger.error(f"Error in join and sync: {str(e)}")
+        return {'success': False, 'message': f'Failed to join room: {str(e)}'}
+
+@socketio.on('join_tournament')
+@traced('join_tournament', root=True)
+def on_join_tournament(data):
+    """Follow a tournament from its invite; the ack has the player's current room
+
+    The socket gets every round announcement from here on, which is the
+    only way a player with a bye hears about their next room.
+    """
+    try:
+        tournament = tournaments.get(str(data.get('tournament_id', '')).strip().upper())
+        player_name = str(data.get('player_name', '')).strip()
+        seat_token = str(data.get('seat_token') or '')
+
+        if tournament is None or not seat_token_matches(seat_token, tournament.seat_tokens.get(player_name)):
+            logger.warning(f"Refusing tournament invite from {request.sid}")
+            return {'success': False, 'message': 'Tournament not found or invalid invite'}
+
+        tournaments.watch(tournament, player_name, request.sid)
+        summary = tournament.summary()
+        logger.debug(f"{player_name} ({request.sid}) follows tournament {tournament.id}")
+        return {
+            'success': True,
+            'tournament_id': tournament.id,
+            'name': tournament.name,
+            'round': summary['round'],
+            'room_id': summary['assignments'].get(player_name),
+            'bye': player_name in summary['byes'],
+            'champion': summary['champion'],
+            'finished': summary['finished_at'] is not None
+        }
+
+    except Exception as e:
+        logger.error(f"Error joining tournament: {str(e)}")
+        return {'success': False, 'message': f'Failed to join tournament: {str(e)}'}
 
 @socketio.on('start_game')
+@traced('start_game', root=True)
 def on_start_game(data):
     try:
-        room_id = data.get('room_id', '').strip().upper()
-        print(f"Start game request for room {room_id} from {request.sid}")
+        room_id = normalize_room_id(data.get('room_id', ''))
+        logger.debug(f"Start game request for room {room_id} from {request.sid}")
 
         if not room_id:
             emit('error', {'message': 'Room ID is required'})
             return
 
-        if room_id not in game_rooms:
-            print(f"Error: Room {room_id} not found")
-            emit('error', {'message': 'Room not found'})
-            return
-
-        game = game_rooms[room_id]
+        with locked_room(room_id) as game:
+            if game is None:
+                logger.warning(f"Error: Room {room_id} not found")
+                emit('error', {'message': 'Room not found'})
+                return
 
-        # Update activity timestamp
-        game.last_activity = time.time()
+            # Update activity timestamp
+            game.last_activity = time.time()
 
-        # Additional validation
-        if len(game.players) < 2:
-            print(f"Error: Not enough players in room {room_id}")
-            emit('error', {'message': 'Need at least 2 players to start'})
-            return
+            # Additional validation
+            if len(game.players) < game.min_players:
+                logger.warning(f"Error: Not enough players in room {room_id}")
+                emit('error', {'message': f'Need at least {game.min_players} players to start'})
+                return
 
-        success, message = game.start_game(request.sid)
+            success, message = game.start_game(request.sid)
+            if success:
+                arm_turn_deadline(game)
+                game_state = game.get_game_state()
 
         if not success:
-            print(f"Error starting game in room {room_id}: {message}")
+            logger.warning(f"Error starting game in room {room_id}: {message}")
             emit('error', {'message': message})
             return
 
-        print(f"Broadcasting game_started to room {room_id}")
+        logger.debug(f"Broadcasting game_started to room {room_id}")
 
         # Notify all players that the game has started
-        socketio.emit('game_started', {
+        broadcast_to_room(game, 'game_started', {
             'message': message,
-            'game_state': game.get_game_state()
-        }, to=room_id)
+            'game_state': game_state
+        })
+        spectator_hub.publish(room_id, game_state)
 
-        print(f"Game started successfully in room {room_id}")
+        logger.info(f"Game started successfully in room {room_id}")
 
     except Exception as e:
-        print(f"Error starting game: {str(e)}")
+        logger.error(f"Error starting game: {str(e)}")
         emit('error', {'message': f'Failed to start game: {str(e)}'})
 
 @socketio.on('pull_trigger')
+@traced('pull_trigger', root=True)
 def on_pull_trigger(data):
     try:
-        room_id = data.get('room_id', '').strip().upper()
-        print(f"Pull trigger request for room {room_id} from {request.sid}")
+        room_id = normalize_room_id(data.get('room_id', ''))
+        logger.debug(f"Pull trigger request for room {room_id} from {request.sid}")
 
         if not room_id:
             emit('error', {'message': 'Room ID is required'})
             return
 
-        if room_id not in game_rooms:
-            print(f"Error: Room {room_id} not found")
-            emit('error', {'message': 'Room not found'})
-            return
+        with locked_room(room_id) as game:
+            if game is None:
+                logger.warning(f"Error: Room {room_id} not found")
+                emit('error', {'message': 'Room not found'})
+                return
 
-        game = game_rooms[room_id]
+            # Update activity timestamp
+            game.last_activity = time.time()
 
-        # Update activity timestamp
-        game.last_activity = time.time()
-
-        success, message, result_data = game.pull_trigger(request.sid)
+            success, message, result_data = game.pull_trigger(request.sid)
+            if success:
+                game.idle_turns = 0
+                record_game_result(game, result_data)
+                arm_turn_deadline(game)
+                game_state = game.get_game_state()
 
         if not success:
-            print(f"Error pulling trigger in room {room_id}: {message}")
+            logger.warning(f"Error pulling trigger in room {room_id}: {message}")
             emit('error', {'message': message})
             return
 
-        print(f"Broadcasting trigger_result to room {room_id}")
+        logger.debug(f"Broadcasting trigger_result to room {room_id}")
 
-        # Notify all players of the result
-        socketio.emit('trigger_result', {
+        # Notify all players of the result immediately; spectators get the
+        # coalesced state on the next tick
+        broadcast_to_room(game, 'trigger_result', {
             'message': message,
             'result_data': result_data,
-            'game_state': game.get_game_state()
-        }, to=room_id)
+            'game_state': game_state
+        })
+        spectator_hub.publish(room_id, game_state)
+        advance_tournament(game, result_data)
 
-        print(f"Trigger pulled successfully in room {room_id}: {message}")
+        logger.debug(f"Trigger pulled successfully in room {room_id}: {message}")
 
     except Exception as e:
-        print(f"Error pulling trigger: {str(e)}")
+        logger.error(f"Error pulling trigger: {str(e)}")
         emit('error', {'message': f'Failed to pull trigger: {str(e)}'})
 
 @socketio.on('reset_game')
+@traced('reset_game', root=True)
 def on_reset_game(data):
     try:
-        room_id = data.get('room_id', '').strip().upper()
-        print(f"Reset game request for room {room_id} from {request.sid}")
+        room_id = normalize_room_id(data.get('room_id', ''))
+        logger.debug(f"Reset game request for room {room_id} from {request.sid}")
 
         if not room_id:
             emit('error', {'message': 'Room ID is required'})
             return
 
-        if room_id not in game_rooms:
-            print(f"Error: Room {room_id} not found")
-            emit('error', {'message': 'Room not found'})
-            return
+        with locked_room(room_id) as game:
+            if game is None:
+                logger.warning(f"Error: Room {room_id} not found")
+                emit('error', {'message': 'Room not found'})
+                return
 
-        game = game_rooms[room_id]
+            # Update activity timestamp
+            game.last_activity = time.time()
 
-        # Update activity timestamp
-        game.last_activity = time.time()
+            if request.sid != game.host:
+                logger.warning(f"Error: Non-host {request.sid} tried to reset game in room {room_id}")
+                emit('error', {'message': 'Only the host can reset the game'})
+                return
 
-        if request.sid != game.host:
-            print(f"Error: Non-host {request.sid} tried to reset game in room {room_id}")
-            emit('error', {'message': 'Only the host can reset the game'})
-            return
-
-        # Validate that we can reset
-        if not game.players:
-            print(f"Error: No players in room {room_id} to reset")
-            emit('error', {'message': 'Cannot reset empty room'})
-            return
+            # Validate that we can reset
+            if not game.players:
+                logger.warning(f"Error: No players in room {room_id} to reset")
+                emit('error', {'message': 'Cannot reset empty room'})
+                return
 
-        game.reset_round()
-        game.game_started = False
+            game.reset_round()
+            game.game_started = False
+            record_event('reset', room_id)
+            arm_turn_deadline(game)
+            game_state = game.get_game_state()
 
-        print(f"Broadcasting game_reset to room {room_id}")
+        logger.debug(f"Broadcasting game_reset to room {room_id}")
 
         # Notify all players
-        socketio.emit('game_reset', {
+        broadcast_to_room(game, 'game_reset', {
             'message': 'Game has been reset!',
-            'game_state': game.get_game_state()
-        }, to=room_id)
+            'game_state': game_state
+        })
+        spectator_hub.publish(room_id, game_state)
 
-        print(f"Game reset successfully in room {room_id}")
+        logger.info(f"Game reset successfully in room {room_id}")
 
     except Exception as e:
-        print(f"Error resetting game: {str(e)}")
+        logger.error(f"Error resetting game: {str(e)}")
         emit('error', {'message': f'Failed to reset game: {str(e)}'})
 
 @socketio.on('get_game_state')
+@traced('get_game_state', root=True)
 def on_get_game_state(data):
     try:
-        room_id = data.get('room_id', '').strip().upper()
-        print(f"Get game state request for room {room_id} from {request.sid}")
+        room_id = normalize_room_id(data.get('room_id', ''))
+        logger.debug(f"Get game state request for room {room_id} from {request.sid}")
 
         if not room_id:
             emit('error', {'message': 'Room ID is required'})
             return
 
-        if room_id not in game_rooms:
-            print(f"Error: Room {room_id} not found for game state request")
-            # Send empty game state instead of error to allow showing join modal
-            emit('game_state_update', {'game_state': None})
-            return
-
-        game = game_rooms[room_id]
+        with locked_room(room_id) as game:
+            if game is None:
+                logger.warning(f"Error: Room {room_id} not found for game state request")
+                # Send empty game state instead of error to allow showing join modal
+                emit('game_state_update', {'game_state': None})
+                return
 
-        # Update activity timestamp
-        game.last_activity = time.time()
+            # Update activity timestamp
+            game.last_activity = time.time()
 
-        game_state = game.get_game_state()
+            game_state = game.get_game_state()
 
         emit('game_state_update', {'game_state': game_state})
-        print(f"Game state sent for room {room_id}")
+        logger.debug(f"Game state sent for room {room_id}")
 
     except Exception as e:
-        print(f"Error getting game state: {str(e)}")
+        logger.error(f"Error getting game state: {str(e)}")
         emit('error', {'message': f'Failed to get game state: {str(e)}'})
 
+@socketio.on('spectate_room')
+@traced('spectate_room', root=True)
+def on_spectate_room(data):
+    try:
+        room_id = normalize_room_id(data.get('room_id', ''))
+        logger.debug(f"Spectate request for room {room_id} from {request.sid}")
+
+        if not room_id:
+            emit('error', {'message': 'Room ID is required'})
+            return
+
+        game = get_room(room_id)
+        if game is None:
+            logger.warning(f"Error: Room {room_id} not found for spectate request")
+            emit('error', {'message': 'Room not found or has expired'})
+            return
+
+        if request.sid in game.players:
+            emit('error', {'message': 'Players cannot spectate their own room'})
+            return
+
+        # Spectators are tracked separately and never take a seat
+        spectator_hub.add_spectator(room_id, request.sid)
+
+        emit('spectator_state', {
+            'game_state': game.get_game_state(),
+            'spectator_count': spectator_hub.spectator_count(room_id)
+        })
+        logger.debug(f"{request.sid} is spectating room {room_id}")
+
+    except Exception as e:
+        logger.error(f"Error spectating room: {str(e)}")
+        emit('error', {'message': f'Failed to spectate room: {str(e)}'})
+
+@socketio.on('stop_spectating')
+@traced('stop_spectating', root=True)
+def on_stop_spectating(data=None):
+    try:
+        room_id = spectator_hub.remove_spectator(request.sid)
+        if room_id:
+            logger.debug(f"{request.sid} stopped spectating room {room_id}")
+
+    except Exception as e:
+        logger.error(f"Error stopping spectating: {str(e)}")
+        emit('error', {'message': f'Failed to stop spectating: {str(e)}'})
+
 if __name__ == '__main__':
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
+    app = create_app()
+    start_background_services(app)
+    socketio.run(
+        app,
+        debug=app.config['DEBUG'],
+        host=app.config['HOST'],
+        port=app.config['PORT'],
+        allow_unsafe_werkzeug=True
+    )
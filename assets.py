@@ -0,0 +1,197 @@
+"""
+Static asset pipeline and rendered page cache.
+
+Stylesheets and scripts under static/ are bundled once at startup into
+content-hashed files with pre-compressed gzip (and brotli, when the
+optional Brotli package is installed) variants kept in memory. Hashed
+bundles never change, so they are served with long-lived immutable cache
+headers. Rendered pages are cached the same way and revalidated with
+ETags, so unchanged pages cost a 304 instead of a Jinja render.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from werkzeug.wrappers import Response
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+# Bundle name -> source files (relative to the static folder) in load order
+ASSET_BUNDLES = {
+    'app.css': ['css/base.css'],
+    'app.js': ['js/base.js'],
+    'index.js': ['js/index.js'],
+    'create.js': ['js/create.js'],
+    'room.js': ['js/room.js']
+}
+
+MIMETYPES = {
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.html': 'text/html; charset=utf-8'
+}
+
+# Hashed bundles never change, so browsers may keep them for a year
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Pages must be revalidated, which is a cheap 304 while the ETag matches
+PAGE_CACHE_CONTROL = 'no-cache'
+
+
+def accepted_encodings(accept_encoding):
+    """Parse an Accept-Encoding header into the set of usable codings"""
+    encodings = set()
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if coding and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.add(coding.lower())
+    return encodings
+
+
+class CompressedEntry:
+    """A response body with its pre-compressed variants"""
+
+    def __init__(self, body, mimetype):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        self.body = body
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(body).hexdigest()
+        self.variants = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(body)
+
+        # Only keep variants that are actually smaller
+        self.variants = {encoding: data for encoding, data in self.variants.items()
+                         if len(data) < len(body)}
+
+    def negotiate(self, accept_encoding):
+        """Pick the smallest variant the client accepts"""
+        accepted = accepted_encodings(accept_encoding)
+        best_encoding, best_data = None, self.body
+        for encoding, data in self.variants.items():
+            if encoding in accepted and len(data) < len(best_data):
+                best_encoding, best_data = encoding, data
+        return best_encoding, best_data
+
+    def response(self, request, cache_control):
+        """Build a conditional response honouring If-None-Match"""
+        encoding, data = self.negotiate(request.headers.get('Accept-Encoding'))
+
+        response = Response(data, mimetype=self.mimetype)
+        response.headers['Cache-Control'] = cache_control
+        response.headers['Vary'] = 'Accept-Encoding'
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+        # Each encoding is a different representation, so it gets its own tag
+        response.set_etag(f"{self.digest[:20]}-{encoding or 'identity'}")
+        return response.make_conditional(request)
+
+
+class AssetPipeline:
+    """Content-hashed, pre-compressed static bundles"""
+
+    def __init__(self, static_folder, url_prefix='/assets', bundles=None):
+        self.static_folder = static_folder
+        self.url_prefix = url_prefix
+        self.bundles = bundles or ASSET_BUNDLES
+        self.manifest = {}  # {bundle name: hashed file name}
+        self.files = {}  # {hashed file name: CompressedEntry}
+
+    def build(self):
+        """Bundle, hash and compress every asset"""
+        manifest = {}
+        files = {}
+
+        for name, sources in self.bundles.items():
+            parts = []
+            for source in sources:
+                with open(os.path.join(self.static_folder, source), encoding='utf-8') as f:
+                    parts.append(f.read())
+
+            stem, ext = os.path.splitext(name)
+            entry = CompressedEntry('\n'.join(parts), MIMETYPES.get(ext, 'application/octet-stream'))
+            hashed_name = f"{stem}.{entry.digest[:12]}{ext}"
+
+            manifest[name] = hashed_name
+            files[hashed_name] = entry
+
+        self.manifest = manifest
+        self.files = files
+        return manifest
+
+    def url(self, name):
+        """URL of the current hashed version of a bundle"""
+        if name not in self.manifest:
+            self.build()
+        return f"{self.url_prefix}/{self.manifest[name]}"
+
+    def get(self, filename):
+        """Look up a hashed bundle by file name"""
+        return self.files.get(filename)
+
+    def get_stats(self):
+        """Sizes of every bundle and its compressed variants"""
+        return {
+            name: {
+                'file': hashed_name,
+                'bytes': len(self.files[hashed_name].body),
+                **{f"{encoding}_bytes": len(data)
+                   for encoding, data in self.files[hashed_name].variants.items()}
+            }
+            for name, hashed_name in self.manifest.items()
+        }
+
+
+class PageCache:
+    """Bounded LRU cache of rendered pages"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # {key: CompressedEntry}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, render):
+        """Return the cached page for key, rendering it on first use"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = CompressedEntry(render(), MIMETYPES['.html'])
+
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        """Drop every cached page"""
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self):
+        """Hit/miss counters and current size"""
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
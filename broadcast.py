@@ -0,0 +1,366 @@
+"""
+Broadcast helpers for the Russian Roulette Socket.IO server.
+
+Every outbound message goes through a bounded per-connection queue that
+is drained by a small pool of worker threads, so a slow socket only holds
+up its own queue instead of the handler thread for the whole room.
+Superseded state updates are collapsed into the latest one, and clients
+that fall behind are downgraded to state-only updates or disconnected.
+
+Players receive game events immediately. Spectators watch through a
+separate channel where state updates are coalesced: only the latest game
+state per room is kept and it is sent once per tick, so a burst of updates
+never queues up behind a large audience.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from tracing import Tracer
+
+logger = logging.getLogger('russian_roulette.broadcast')
+
+# Events where only the most recent undelivered message matters
+COALESCED_EVENTS = ('game_state_update', 'spectator_state')
+
+
+class OutboundQueue:
+    """Bounded outbound message queue for a single connection"""
+
+    def __init__(self, socket_id):
+        self.socket_id = socket_id
+        self.messages = deque()  # [event, payload] entries in send order
+        self.latest = {}  # {event: entry} for undelivered coalesced events
+        self.scheduled = False
+        self.downgraded = False
+        self.closing = False
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.messages)
+
+    def push(self, event, payload):
+        """Append a message, collapsing it into a pending one if superseded
+
+        A superseded entry is removed and the new one goes to the tail, so
+        the newer state is never delivered ahead of events queued after the
+        older one.
+        """
+        if event in COALESCED_EVENTS:
+            entry = self.latest.get(event)
+            if entry is not None:
+                self.messages.remove(entry)
+                entry = [event, payload]
+                self.latest[event] = entry
+                self.messages.append(entry)
+                return False
+            entry = [event, payload]
+            self.latest[event] = entry
+        else:
+            entry = [event, payload]
+
+        self.messages.append(entry)
+        return True
+
+    def pop(self):
+        """Take the next message to deliver"""
+        entry = self.messages.popleft()
+        if self.latest.get(entry[0]) is entry:
+            del self.latest[entry[0]]
+        return entry
+
+    def downgrade(self):
+        """Collapse everything queued into a single latest-state update"""
+        latest_state = None
+        kept = deque()
+        for event, payload in self.messages:
+            if isinstance(payload, dict) and 'game_state' in payload:
+                latest_state = payload['game_state']
+            else:
+                kept.append([event, payload])
+
+        collapsed = len(self.messages) - len(kept)
+        self.messages = kept
+        self.latest = {}
+        self.downgraded = True
+
+        if latest_state is not None:
+            self.push('game_state_update', {'game_state': latest_state})
+            collapsed -= 1
+        self.dropped += collapsed
+
+
+class OutboundDispatcher:
+    """Per-connection outbound queues drained by a pool of worker threads"""
+
+    def __init__(self, socketio, max_queue=64, high_water=32, workers=4,
+                 overflow_policy='downgrade', tracer=None):
+        if overflow_policy not in ('downgrade', 'disconnect'):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.socketio = socketio
+        self.max_queue = max_queue
+        self.high_water = high_water
+        self.worker_count = workers
+        self.overflow_policy = overflow_policy
+        self.tracer = tracer or Tracer()
+        self.queues = {}  # {socket_id: OutboundQueue}
+        self.ready = queue.Queue()
+        self.lock = threading.Lock()
+        self.stats = {
+            'enqueued': 0,
+            'delivered': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'downgraded': 0,
+            'disconnected': 0,
+            'send_errors': 0
+        }
+        self._threads = []
+
+    def register(self, socket_id):
+        """Create the outbound queue for a newly connected socket"""
+        with self.lock:
+            self.queues.setdefault(socket_id, OutboundQueue(socket_id))
+
+    def unregister(self, socket_id):
+        """Discard the outbound queue of a disconnected socket"""
+        with self.lock:
+            outbound = self.queues.pop(socket_id, None)
+            if outbound is not None:
+                self.stats['dropped'] += len(outbound)
+
+    def send(self, socket_id, event, payload):
+        """Queue a message for one connection"""
+        with self.lock:
+            self._enqueue(socket_id, event, payload)
+
+    def send_many(self, socket_ids, event, payload):
+        """Queue the same message for several connections"""
+        with self.lock:
+            for socket_id in socket_ids:
+                self._enqueue(socket_id, event, payload)
+
+    def _enqueue(self, socket_id, event, payload):
+        outbound = self.queues.get(socket_id)
+        if outbound is None or outbound.closing:
+            # Not connected (any more), nothing to deliver to
+            self.stats['dropped'] += 1
+            return
+
+        self.stats['enqueued'] += 1
+
+        if outbound.downgraded and isinstance(payload, dict) and 'game_state' in payload:
+            # Downgraded clients only get the latest state
+            event, payload = 'game_state_update', {'game_state': payload['game_state']}
+
+        if outbound.push(event, payload):
+            if len(outbound) >= self.high_water:
+                self._overflow(outbound)
+        else:
+            self.stats['coalesced'] += 1
+
+        if not outbound.scheduled:
+            outbound.scheduled = True
+            self.ready.put(outbound)
+
+    def _overflow(self, outbound):
+        if self.overflow_policy == 'downgrade' and len(outbound) < self.max_queue:
+            if not outbound.downgraded:
+                self.stats['downgraded'] += 1
+                logger.warning(f"Downgrading slow client {outbound.socket_id} to state-only updates")
+            dropped_before = outbound.dropped
+            outbound.downgrade()
+            self.stats['dropped'] += outbound.dropped - dropped_before
+            return
+
+        # Still over the limit, give up on this client
+        logger.warning(f"Disconnecting slow client {outbound.socket_id} ({len(outbound)} queued)")
+        self.stats['dropped'] += len(outbound)
+        outbound.messages.clear()
+        outbound.latest = {}
+        outbound.closing = True
+
+    def drain(self, outbound):
+        """Deliver everything queued for one connection"""
+        while True:
+            with self.lock:
+                if outbound.closing:
+                    outbound.scheduled = False
+                    self.queues.pop(outbound.socket_id, None)
+                    self.stats['disconnected'] += 1
+                    break
+                if not outbound.messages:
+                    outbound.scheduled = False
+                    outbound.downgraded = False
+                    return
+                event, payload = outbound.pop()
+
+            try:
+                with self.tracer.trace('socketio.emit', event=event, to=outbound.socket_id):
+                    self.socketio.emit(event, payload, to=outbound.socket_id)
+                self.stats['delivered'] += 1
+            except Exception as e:
+                self.stats['send_errors'] += 1
+                logger.error(f"Error sending {event} to {outbound.socket_id}: {str(e)}")
+
+        try:
+            self.socketio.server.disconnect(outbound.socket_id, namespace='/')
+        except Exception as e:
+            logger.error(f"Error disconnecting slow client {outbound.socket_id}: {str(e)}")
+
+    def run(self):
+        """Worker loop draining connections that have pending messages"""
+        while True:
+            outbound = self.ready.get()
+            try:
+                self.drain(outbound)
+            except Exception as e:
+                logger.error(f"Error in outbound dispatch: {str(e)}")
+
+    def start(self):
+        """Start the worker threads"""
+        while len(self._threads) < self.worker_count:
+            thread = threading.Thread(target=self.run, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self._threads
+
+    def get_stats(self):
+        """Snapshot of queue depths and delivery counters"""
+        with self.lock:
+            depths = {socket_id: len(outbound)
+                      for socket_id, outbound in self.queues.items()
+                      if len(outbound)}
+            downgraded = sum(1 for outbound in self.queues.values()
+                             if outbound.downgraded)
+            return {
+                'connections': len(self.queues),
+                'queued_messages': sum(depths.values()),
+                'max_queue_depth': max(depths.values(), default=0),
+                'deepest_queues': dict(sorted(depths.items(),
+                                              key=lambda item: -item[1])[:10]),
+                'downgraded_connections': downgraded,
+                'ready_backlog': self.ready.qsize(),
+                'max_queue': self.max_queue,
+                'high_water': self.high_water,
+                'overflow_policy': self.overflow_policy,
+                **self.stats
+            }
+
+
+class SpectatorHub:
+    """Coalesced game state fan-out for room spectators"""
+
+    def __init__(self, outbound, tick_interval=0.25):
+        self.outbound = outbound
+        self.tick_interval = tick_interval
+        self.spectators = {}  # {room_id: set(socket_id)}
+        self.spectator_rooms = {}  # {socket_id: room_id}
+        self.pending = {}  # {room_id: latest game_state}
+        self.lock = threading.Lock()
+        self.stats = {
+            'published': 0,
+            'coalesced': 0,
+            'broadcasts': 0
+        }
+        self._thread = None
+
+    def add_spectator(self, room_id, socket_id):
+        """Register a spectator, moving them out of any previous room"""
+        with self.lock:
+            previous_room = self._discard(socket_id)
+            self.spectators.setdefault(room_id, set()).add(socket_id)
+            self.spectator_rooms[socket_id] = room_id
+        return previous_room
+
+    def remove_spectator(self, socket_id):
+        """Unregister a spectator and return the room they were watching"""
+        with self.lock:
+            return self._discard(socket_id)
+
+    def _discard(self, socket_id):
+        room_id = self.spectator_rooms.pop(socket_id, None)
+        if room_id is not None:
+            watchers = self.spectators.get(room_id)
+            if watchers is not None:
+                watchers.discard(socket_id)
+                if not watchers:
+                    del self.spectators[room_id]
+                    self.pending.pop(room_id, None)
+        return room_id
+
+    def drop_room(self, room_id):
+        """Forget all spectators of a room that no longer exists"""
+        with self.lock:
+            for socket_id in self.spectators.pop(room_id, ()):
+                self.spectator_rooms.pop(socket_id, None)
+            self.pending.pop(room_id, None)
+
+    def spectator_count(self, room_id):
+        """Number of spectators currently watching a room"""
+        return len(self.spectators.get(room_id, ()))
+
+    def publish(self, room_id, game_state):
+        """Queue the latest state of a room for the next spectator tick"""
+        if room_id not in self.spectators:
+            return
+
+        with self.lock:
+            if room_id not in self.spectators:
+                return
+            self.stats['published'] += 1
+            if room_id in self.pending:
+                # An unsent update is superseded by this one
+                self.stats['coalesced'] += 1
+            self.pending[room_id] = game_state
+
+    def flush(self):
+        """Send the latest pending state of every room to its spectators"""
+        with self.lock:
+            if not self.pending:
+                return 0
+            pending, self.pending = self.pending, {}
+            watchers = {room_id: list(self.spectators.get(room_id, ()))
+                        for room_id in pending}
+
+        # Per-connection coalescing means a slow spectator only ever holds
+        # the newest state instead of a backlog of ticks
+        for room_id, game_state in pending.items():
+            self.outbound.send_many(watchers[room_id], 'spectator_state', {
+                'game_state': game_state,
+                'spectator_count': len(watchers[room_id])
+            })
+
+        self.stats['broadcasts'] += len(pending)
+        return len(pending)
+
+    def run(self):
+        """Flush pending spectator updates once per tick"""
+        while True:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error in spectator broadcast: {str(e)}")
+
+            time.sleep(self.tick_interval)
+
+    def start(self):
+        """Start the background tick thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def get_stats(self):
+        """Snapshot of spectator fan-out counters"""
+        with self.lock:
+            return {
+                'rooms_watched': len(self.spectators),
+                'spectators': len(self.spectator_rooms),
+                'pending_rooms': len(self.pending),
+                **self.stats
+            }
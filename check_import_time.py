@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the Russian Roulette server.
+
+Imports the application in a fresh interpreter with ``python -X importtime``
+and fails if the cold import takes longer than the budget, if the project's
+own modules spend too long at import time, or if importing starts any
+threads. Short-lived workers and tests only pay for what they use; the
+heavy parts of start-up belong in create_app() and
+start_background_services().
+
+Usage:
+    python check_import_time.py [--budget-ms N] [--self-budget-ms N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+DEFAULT_BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', 500))
+DEFAULT_SELF_BUDGET_MS = int(os.environ.get('IMPORT_TIME_SELF_BUDGET_MS', 50))
+
+# Prints the thread count and the project's own modules (those loaded from
+# this directory), everything else counts as a dependency
+PROBE = """
+import os, sys, threading
+import app
+print(threading.active_count())
+print(','.join(name for name, module in list(sys.modules.items())
+               if os.path.dirname(os.path.abspath(getattr(module, '__file__', None) or '/'))
+               == os.getcwd()))
+"""
+
+
+def measure(module_dir):
+    """Import the app in a fresh interpreter and parse -X importtime output"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=module_dir, capture_output=True, text=True, check=True
+    )
+
+    timings = {}  # {module: (self_us, cumulative_us)}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+
+    output = result.stdout.strip().splitlines()
+    thread_count = int(output[-2])
+    project_modules = set(output[-1].split(','))
+    return timings, thread_count, project_modules
+
+
+def main():
+    """Run the check and exit non-zero when a budget is exceeded"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=int, default=DEFAULT_BUDGET_MS,
+                        help='maximum cumulative import time of app')
+    parser.add_argument('--self-budget-ms', type=int, default=DEFAULT_SELF_BUDGET_MS,
+                        help="maximum import time spent in the project's own modules")
+    args = parser.parse_args()
+
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    timings, thread_count, project_modules = measure(module_dir)
+
+    total_ms = timings['app'][1] / 1000
+    self_ms = sum(timings[name][0] for name in project_modules if name in timings) / 1000
+
+    print(f"Cumulative import time of app: {total_ms:.1f} ms (budget {args.budget_ms} ms)")
+    print(f"Project modules self time:     {self_ms:.1f} ms (budget {args.self_budget_ms} ms)")
+    print(f"Threads after import:          {thread_count}")
+
+    print("Slowest imports:")
+    slowest = sorted(timings.items(), key=lambda item: -item[1][0])[:10]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms total  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"importing app took {total_ms:.1f} ms")
+    if self_ms > args.self_budget_ms:
+        failures.append(f"project modules took {self_ms:.1f} ms")
+    if thread_count != 1:
+        failures.append(f"importing app started {thread_count - 1} thread(s)")
+
+    if failures:
+        print("❌ Import-time budget exceeded: " + "; ".join(failures))
+        return 1
+
+    print("✅ Import-time budget met")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,18 +3,96 @@ Configuration settings for the Russian Roulette Flask application.
 
 This module contains configuration classes for different environments
 (development, production, testing) and application settings.
+
+Every tuning knob can be overridden from the environment (or a .env file)
+using the same name as the setting, so capacity tuning in production is a
+config change rather than a code change.
 """
 
+import functools
 import os
 import secrets
 from datetime import timedelta
 
 
+class EnvSetting:
+    """A setting read from the environment each time it is looked up
+
+    Settings are resolved when get_config()/create_app() copy them into
+    the app, not when this module is imported, so importing it neither
+    depends on nor changes the environment.
+    """
+
+    def __init__(self, read):
+        self.read = read
+
+    def __get__(self, obj, owner=None):
+        return self.read()
+
+
+def env_str(name, default):
+    """A string setting from the environment"""
+    return EnvSetting(lambda: os.environ.get(name, default))
+
+
+def env_int(name, default):
+    """An integer setting from the environment"""
+    def read():
+        value = os.environ.get(name)
+        return int(value) if value not in (None, '') else default
+    return EnvSetting(read)
+
+
+def env_float(name, default):
+    """A float setting from the environment"""
+    def read():
+        value = os.environ.get(name)
+        return float(value) if value not in (None, '') else default
+    return EnvSetting(read)
+
+
+def env_bool(name, default):
+    """A boolean setting from the environment"""
+    def read():
+        value = os.environ.get(name)
+        if value in (None, ''):
+            return default
+        return value.strip().lower() in ('true', '1', 'yes', 'on')
+    return EnvSetting(read)
+
+
+def env_list(name, default):
+    """A comma separated setting from the environment"""
+    def read():
+        value = os.environ.get(name)
+        if value in (None, ''):
+            return default
+        items = [item.strip() for item in value.split(',') if item.strip()]
+        return items[0] if items == ['*'] else items
+    return EnvSetting(read)
+
+
+@functools.lru_cache(maxsize=None)
+def generated_secret_key():
+    """Random key for a process started without SECRET_KEY, made on first use"""
+    return secrets.token_hex(32)
+
+
+@functools.lru_cache(maxsize=None)
+def load_environment():
+    """Load a .env file into the environment, once per process"""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:  # python-dotenv is optional
+        return False
+    return load_dotenv()
+
+
 class Config:
     """Base configuration class with common settings."""
 
     # Secret key for session management and CSRF protection
-    SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
+    SECRET_KEY = EnvSetting(lambda: os.environ.get('SECRET_KEY') or generated_secret_key())
 
     # Session configuration
     PERMANENT_SESSION_LIFETIME = timedelta(hours=2)
@@ -22,31 +100,171 @@ class Config:
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
 
+    # Server settings (used by run.py)
+    HOST = env_str('FLASK_HOST', '0.0.0.0')
+    PORT = env_int('FLASK_PORT', 5000)
+
     # Application settings
-    MAX_PLAYERS = 6
-    MIN_PLAYERS = 2
-    CHAMBER_COUNT = 6
+    MAX_PLAYERS = env_int('MAX_PLAYERS', 6)
+    MIN_PLAYERS = env_int('MIN_PLAYERS', 2)
+    CHAMBER_COUNT = env_int('CHAMBER_COUNT', 6)
+
+    # Room IDs (Crockford Base32); give each shard its own ROOM_ID_PREFIX
+    ROOM_ID_LENGTH = env_int('ROOM_ID_LENGTH', 6)  # random characters after the prefix
+    ROOM_ID_PREFIX = env_str('ROOM_ID_PREFIX', '')
+    ROOM_ID_POOL_SIZE = env_int('ROOM_ID_POOL_SIZE', 256)  # IDs generated ahead of time
+
+    # Tournaments (2 seats per room makes a knockout bracket)
+    TOURNAMENT_ROOM_SIZE = env_int('TOURNAMENT_ROOM_SIZE', 2)
+    TOURNAMENT_MAX_PLAYERS = env_int('TOURNAMENT_MAX_PLAYERS', 1024)
+    TOURNAMENT_RETENTION = env_int('TOURNAMENT_RETENTION', 3600)  # seconds finished ones are kept
+    # Seconds seeded players get to take their seat before the room starts
+    # with whoever showed up (or advances a lone player)
+    TOURNAMENT_SEATING_TIMEOUT = env_float('TOURNAMENT_SEATING_TIMEOUT', 120)
+    # Turn timeout for tournament rooms when TURN_TIMEOUT is 0, since
+    # brackets only advance if absent players are pulled for
+    TOURNAMENT_TURN_TIMEOUT = env_float('TOURNAMENT_TURN_TIMEOUT', 30)
+
+    # Turn timeouts (0 disables them); the action is 'skip' or 'pull'
+    TURN_TIMEOUT = env_float('TURN_TIMEOUT', 30)  # seconds
+    TURN_TIMEOUT_ACTION = env_str('TURN_TIMEOUT_ACTION', 'skip')
+
+    # Room cleanup
+    ROOM_CLEANUP_INTERVAL = env_int('ROOM_CLEANUP_INTERVAL', 300)  # 5 minutes
+    ROOM_INACTIVE_TIMEOUT = env_int('ROOM_INACTIVE_TIMEOUT', 900)  # 15 minutes
+
+    # Idle-room hibernation (0 disables it); storage is 'memory' or 'mmap'
+    HIBERNATE_AFTER = env_int('HIBERNATE_AFTER', 120)  # idle seconds before hibernating
+    HIBERNATION_SCAN_INTERVAL = env_int('HIBERNATION_SCAN_INTERVAL', 30)  # seconds
+    HIBERNATION_STORAGE = env_str('HIBERNATION_STORAGE', 'memory')
+    HIBERNATION_FILE = env_str('HIBERNATION_FILE', 'hibernation.bin')  # in the instance folder
+    HIBERNATION_COMPRESS_LEVEL = env_int('HIBERNATION_COMPRESS_LEVEL', 6)
+
+    # Game history and leaderboard (SQLite file in the instance folder)
+    HISTORY_ENABLED = env_bool('HISTORY_ENABLED', True)
+    HISTORY_DB = env_str('HISTORY_DB', 'history.sqlite3')
+    HISTORY_BATCH_SIZE = env_int('HISTORY_BATCH_SIZE', 500)  # games per transaction
+    HISTORY_FLUSH_INTERVAL = env_float('HISTORY_FLUSH_INTERVAL', 1.0)  # seconds
+    HISTORY_MAX_PENDING = env_int('HISTORY_MAX_PENDING', 10000)  # queued games before dropping
+
+    # Game event export (rotating NDJSON files in the instance folder)
+    EVENTS_ENABLED = env_bool('EVENTS_ENABLED', True)
+    EVENTS_DIR = env_str('EVENTS_DIR', 'events')
+    EVENTS_BUFFER_SIZE = env_int('EVENTS_BUFFER_SIZE', 65536)  # records held before dropping
+    EVENTS_FLUSH_INTERVAL = env_float('EVENTS_FLUSH_INTERVAL', 0.5)  # seconds
+    EVENTS_MAX_FILE_BYTES = env_int('EVENTS_MAX_FILE_BYTES', 10 * 1024 * 1024)
+    EVENTS_MAX_FILES = env_int('EVENTS_MAX_FILES', 20)
+
+    # Admission control (0 disables a limit); new rooms are refused above
+    # ADMISSION_SOFT_RATIO of a limit, joins and connections at the limit
+    ADMISSION_MAX_ROOMS = env_int('ADMISSION_MAX_ROOMS', 10000)  # live and hibernated
+    ADMISSION_MAX_PLAYERS = env_int('ADMISSION_MAX_PLAYERS', 50000)  # seats held by connected players
+    ADMISSION_MAX_SOCKETS = env_int('ADMISSION_MAX_SOCKETS', 50000)  # connected sockets
+    ADMISSION_MAX_LAG_MS = env_float('ADMISSION_MAX_LAG_MS', 500)  # thread wake-up lag
+    ADMISSION_SOFT_RATIO = env_float('ADMISSION_SOFT_RATIO', 0.8)
+    ADMISSION_RETRY_AFTER = env_int('ADMISSION_RETRY_AFTER', 5)  # seconds, sent to refused clients
+
+    # Socket.IO / Engine.IO settings
+    # Only 'threading': the background services use plain threads, sleeps
+    # and locks, which would block an eventlet/gevent loop
+    SOCKETIO_ASYNC_MODE = env_str('SOCKETIO_ASYNC_MODE', 'threading')
+    SOCKETIO_CORS_ALLOWED_ORIGINS = env_list('SOCKETIO_CORS_ALLOWED_ORIGINS', '*')
+    SOCKETIO_PING_INTERVAL = env_float('SOCKETIO_PING_INTERVAL', 25)  # seconds
+    SOCKETIO_PING_TIMEOUT = env_float('SOCKETIO_PING_TIMEOUT', 20)  # seconds
+    SOCKETIO_MAX_HTTP_BUFFER_SIZE = env_int('SOCKETIO_MAX_HTTP_BUFFER_SIZE', 1000000)  # bytes
+    # 'websocket' skips the long-polling handshake entirely; 'polling' starts
+    # on long-polling and upgrades (sessions that have not upgraded after
+    # SOCKETIO_UPGRADE_DEADLINE seconds are disconnected and reconnect over
+    # WebSocket only)
+    SOCKETIO_TRANSPORT_POLICY = env_str('SOCKETIO_TRANSPORT_POLICY', 'polling')
+    SOCKETIO_UPGRADE_DEADLINE = env_float('SOCKETIO_UPGRADE_DEADLINE', 10)  # seconds, 0 disables
+    SOCKETIO_HTTP_COMPRESSION = env_bool('SOCKETIO_HTTP_COMPRESSION', True)  # polling responses only
+    SOCKETIO_COMPRESSION_THRESHOLD = env_int('SOCKETIO_COMPRESSION_THRESHOLD', 1024)  # bytes
+
+    # Outbound queues
+    OUTBOUND_MAX_QUEUE = env_int('OUTBOUND_MAX_QUEUE', 64)  # messages before disconnecting
+    OUTBOUND_HIGH_WATER = env_int('OUTBOUND_HIGH_WATER', 32)  # depth at which a slow client is handled
+    OUTBOUND_WORKERS = env_int('OUTBOUND_WORKERS', 4)  # threads draining per-connection queues
+    OUTBOUND_OVERFLOW_POLICY = env_str('OUTBOUND_OVERFLOW_POLICY', 'downgrade')  # or 'disconnect'
+
+    # Spectators
+    SPECTATOR_TICK_INTERVAL = env_float('SPECTATOR_TICK_INTERVAL', 0.25)  # seconds
+
+    # Rendered page cache
+    PAGE_CACHE_ENABLED = env_bool('PAGE_CACHE_ENABLED', True)
+    PAGE_CACHE_MAX_ENTRIES = env_int('PAGE_CACHE_MAX_ENTRIES', 1024)
+    PAGE_CACHE_MAX_KEY_LENGTH = env_int('PAGE_CACHE_MAX_KEY_LENGTH', 32)
+
+    # Tracing (fraction of socket handlers traced; 0 turns it off)
+    TRACE_SAMPLE_RATE = env_float('TRACE_SAMPLE_RATE', 0.0)
+    TRACE_BUFFER_SIZE = env_int('TRACE_BUFFER_SIZE', 10000)  # finished spans kept
+    TRACE_DIR = env_str('TRACE_DIR', 'traces')  # in the instance folder
+
+    # On-demand profiling (/debug/profile, only available with an ADMIN_TOKEN)
+    ADMIN_TOKEN = env_str('ADMIN_TOKEN', '')
+    PROFILE_INTERVAL = env_float('PROFILE_INTERVAL', 0.005)  # seconds between stack samples
+    PROFILE_MAX_SECONDS = env_float('PROFILE_MAX_SECONDS', 60)
+    PROFILE_TRACEMALLOC_FRAMES = env_int('PROFILE_TRACEMALLOC_FRAMES', 1)  # frames per allocation
+
+    # Logging
+    LOG_LEVEL = env_str('LOG_LEVEL', 'INFO')
+    SOCKETIO_LOGGER = env_bool('SOCKETIO_LOGGER', False)
+    ENGINEIO_LOGGER = env_bool('ENGINEIO_LOGGER', False)
+
+    # Metrics (/debug/* endpoints)
+    METRICS_ENABLED = env_bool('METRICS_ENABLED', True)
 
     # JSON settings
     JSON_SORT_KEYS = False
     JSONIFY_PRETTYPRINT_REGULAR = True
 
-    # Template settings
-    TEMPLATES_AUTO_RELOAD = True
+    # Template settings (pages are rendered once and cached, so there is
+    # no point in stat-ing templates on every render)
+    TEMPLATES_AUTO_RELOAD = False
+
+    @classmethod
+    def validate(cls):
+        """Check settings that cannot be fixed up with a default"""
+        if cls.MIN_PLAYERS < 1 or cls.MAX_PLAYERS < cls.MIN_PLAYERS:
+            raise ValueError("MAX_PLAYERS must be at least MIN_PLAYERS (and MIN_PLAYERS at least 1)")
+        if cls.CHAMBER_COUNT < 1:
+            raise ValueError("CHAMBER_COUNT must be at least 1")
+        if cls.ROOM_ID_LENGTH < 4 or len(cls.ROOM_ID_PREFIX) + cls.ROOM_ID_LENGTH > 12:
+            raise ValueError("ROOM_ID_LENGTH must be at least 4, and at most 12 with the prefix")
+        if cls.TOURNAMENT_SEATING_TIMEOUT <= 0 or cls.TOURNAMENT_TURN_TIMEOUT <= 0:
+            raise ValueError("TOURNAMENT_SEATING_TIMEOUT and TOURNAMENT_TURN_TIMEOUT must be positive")
+        if cls.TURN_TIMEOUT_ACTION not in ('skip', 'pull'):
+            raise ValueError("TURN_TIMEOUT_ACTION must be 'skip' or 'pull'")
+        if cls.SOCKETIO_ASYNC_MODE != 'threading':
+            raise ValueError("SOCKETIO_ASYNC_MODE must be 'threading'")
+        if cls.SOCKETIO_TRANSPORT_POLICY not in ('websocket', 'polling'):
+            raise ValueError("SOCKETIO_TRANSPORT_POLICY must be 'websocket' or 'polling'")
+        if cls.HIBERNATION_STORAGE not in ('memory', 'mmap'):
+            raise ValueError("HIBERNATION_STORAGE must be 'memory' or 'mmap'")
+        if not 0 < cls.ADMISSION_SOFT_RATIO <= 1:
+            raise ValueError("ADMISSION_SOFT_RATIO must be between 0 and 1")
+        if not 0 <= cls.TRACE_SAMPLE_RATE <= 1:
+            raise ValueError("TRACE_SAMPLE_RATE must be between 0 and 1")
+        if cls.OUTBOUND_HIGH_WATER > cls.OUTBOUND_MAX_QUEUE:
+            raise ValueError("OUTBOUND_HIGH_WATER must not exceed OUTBOUND_MAX_QUEUE")
 
 
 class DevelopmentConfig(Config):
     """Development environment configuration."""
 
-    DEBUG = True
+    DEBUG = env_bool('FLASK_DEBUG', True)
     TESTING = False
 
     # More verbose logging in development
-    LOG_LEVEL = 'DEBUG'
+    LOG_LEVEL = env_str('LOG_LEVEL', 'DEBUG')
 
     # Allow insecure session cookies for development
     SESSION_COOKIE_SECURE = False
 
+    # Pick up template edits without a restart
+    TEMPLATES_AUTO_RELOAD = True
+    PAGE_CACHE_ENABLED = env_bool('PAGE_CACHE_ENABLED', False)
+
 
 class ProductionConfig(Config):
     """Production environment configuration."""
@@ -59,11 +277,17 @@ class ProductionConfig(Config):
     SESSION_COOKIE_HTTPONLY = True
 
     # Logging
-    LOG_LEVEL = 'WARNING'
+    LOG_LEVEL = env_str('LOG_LEVEL', 'WARNING')
+
+    # Debug endpoints are opt-in in production
+    METRICS_ENABLED = env_bool('METRICS_ENABLED', False)
 
-    # Override secret key check for production
-    if not os.environ.get('SECRET_KEY'):
-        raise ValueError("No SECRET_KEY set for production environment")
+    @classmethod
+    def validate(cls):
+        """Production must not run with a generated secret key"""
+        super().validate()
+        if not os.environ.get('SECRET_KEY'):
+            raise ValueError("No SECRET_KEY set for production environment")
 
 
 class TestingConfig(Config):
@@ -78,6 +302,14 @@ class TestingConfig(Config):
     # Faster password hashing for tests
     SESSION_COOKIE_SECURE = False
 
+    # Keep test output quiet
+    LOG_LEVEL = env_str('LOG_LEVEL', 'WARNING')
+
+    # Tests should not write to the instance folder
+    HISTORY_ENABLED = env_bool('HISTORY_ENABLED', False)
+    EVENTS_ENABLED = env_bool('EVENTS_ENABLED', False)
+    HIBERNATION_STORAGE = 'memory'
+
 
 # Configuration dictionary
 config = {
@@ -90,5 +322,8 @@ config = {
 
 def get_config():
     """Get the configuration class based on environment variable."""
+    load_environment()
     env = os.environ.get('FLASK_ENV', 'development').lower()
-    return config.get(env, config['default'])
+    config_class = config.get(env, config['default'])
+    config_class.validate()
+    return config_class
@@ -0,0 +1,179 @@
+"""
+Game event log with a rotating NDJSON sink and a streaming export.
+
+Every room transition is recorded as one compact JSON object per line.
+Producers (socket handlers and the game engine) only append a dict to a
+bounded deque, under a tiny lock that keeps sequence numbers in buffer
+order, and never do I/O. A sink thread serializes the records and
+appends them to size-rotated NDJSON files. The export reads those files
+lazily, line by line, so it streams in constant memory and can resume
+after any sequence number.
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger('russian_roulette.events')
+
+FILE_PREFIX = 'events-'
+FILE_SUFFIX = '.ndjson'
+SEQ_PREFIX = '{"seq":'
+
+
+def line_seq(line):
+    """Sequence number of a serialized record without parsing the whole line"""
+    end = line.find(',', len(SEQ_PREFIX))
+    return int(line[len(SEQ_PREFIX):end])
+
+
+class EventLog:
+    """Bounded event buffer drained to rotating NDJSON files"""
+
+    def __init__(self, directory, buffer_size=65536, flush_interval=0.5,
+                 max_file_bytes=10 * 1024 * 1024, max_files=20):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.buffer = deque(maxlen=buffer_size)
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # Keep numbering across restarts so exports can resume
+        self.last_written = self._last_seq_on_disk()
+        self.counter = itertools.count(self.last_written + 1)
+
+        self.current_file = None
+        self.current_size = 0
+        self.stats = {
+            'written': 0,
+            'dropped': 0,
+            'files_rotated': 0,
+            'write_errors': 0
+        }
+        self._thread = None
+
+    def emit(self, event_type, room_id, **fields):
+        """Record one event; safe to call from any thread, never does I/O"""
+        record = {'seq': 0, 'ts': round(time.time(), 3),
+                  'type': event_type, 'room': room_id}
+        record.update(fields)
+        with self.lock:
+            record['seq'] = next(self.counter)
+            self.buffer.append(record)
+
+    def files(self):
+        """Retained NDJSON files, oldest first"""
+        names = [name for name in os.listdir(self.directory)
+                 if name.startswith(FILE_PREFIX) and name.endswith(FILE_SUFFIX)]
+        return sorted(os.path.join(self.directory, name) for name in names)
+
+    def _last_seq_on_disk(self):
+        for path in reversed(self.files()):
+            with open(path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 65536))
+                lines = [line for line in f.read().decode('utf-8', 'replace').split('\n')
+                         if line.startswith(SEQ_PREFIX)]
+            if lines:
+                return line_seq(lines[-1])
+        return 0
+
+    def _open_file(self, first_seq):
+        if self.current_file is not None:
+            self.current_file.close()
+            self.stats['files_rotated'] += 1
+
+        # Zero-padded first sequence number, so names sort in order
+        path = os.path.join(self.directory, f"{FILE_PREFIX}{first_seq:012d}{FILE_SUFFIX}")
+        self.current_file = open(path, 'a', encoding='utf-8')
+        self.current_size = self.current_file.tell()
+
+        for old_path in self.files()[:-self.max_files]:
+            try:
+                os.remove(old_path)
+            except OSError as e:
+                logger.warning(f"Could not remove old event file {old_path}: {str(e)}")
+
+    def flush(self):
+        """Write every buffered record to disk"""
+        lines = []
+        while True:
+            try:
+                record = self.buffer.popleft()
+            except IndexError:
+                break
+
+            # The deque discards its oldest records when producers outrun us
+            if record['seq'] > self.last_written + 1:
+                self.stats['dropped'] += record['seq'] - self.last_written - 1
+            self.last_written = record['seq']
+            lines.append(json.dumps(record, separators=(',', ':')) + '\n')
+
+        if not lines:
+            return 0
+
+        if self.current_file is None or self.current_size >= self.max_file_bytes:
+            self._open_file(line_seq(lines[0]))
+
+        data = ''.join(lines)
+        self.current_file.write(data)
+        self.current_file.flush()
+        self.current_size += len(data)
+        self.stats['written'] += len(lines)
+        return len(lines)
+
+    def run(self):
+        """Sink loop"""
+        while True:
+            try:
+                self.flush()
+            except Exception as e:
+                self.stats['write_errors'] += 1
+                logger.error(f"Error writing game events: {str(e)}")
+
+            time.sleep(self.flush_interval)
+
+    def start(self):
+        """Start the sink thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def export(self, offset=0):
+        """Yield NDJSON lines with a sequence number above offset"""
+        paths = self.files()
+        for index, path in enumerate(paths):
+            # Skip whole files that end before the offset
+            if index + 1 < len(paths):
+                next_first = int(os.path.basename(paths[index + 1])[len(FILE_PREFIX):-len(FILE_SUFFIX)])
+                if next_first <= offset + 1:
+                    continue
+
+            try:
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        # A line still being written has no newline yet
+                        if not line.endswith('\n') or not line.startswith(SEQ_PREFIX):
+                            continue
+                        if line_seq(line) > offset:
+                            yield line
+            except FileNotFoundError:
+                # Rotated away while we were streaming
+                continue
+
+    def get_stats(self):
+        """Buffer depth, sequence position and sink counters"""
+        return {
+            'buffered': len(self.buffer),
+            'buffer_size': self.buffer.maxlen,
+            'last_written_seq': self.last_written,
+            'files': len(self.files()),
+            **self.stats
+        }
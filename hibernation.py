@@ -0,0 +1,252 @@
+"""
+Idle-room hibernation for the Russian Roulette server.
+
+Rooms that sit idle (typically a lobby waiting for friends) are serialized
+into a compact zlib-compressed JSON blob and their live game object is
+dropped from the registry. Blobs are kept either in memory or in a local
+append-only file read through mmap. The next lookup of a hibernated room
+rehydrates it transparently.
+"""
+
+import json
+import logging
+import mmap
+import threading
+import time
+import zlib
+
+logger = logging.getLogger('russian_roulette.hibernation')
+
+
+class MemoryBlobStore:
+    """Hibernated room blobs kept as bytes in memory"""
+
+    def __init__(self):
+        self.blobs = {}
+
+    def put(self, key, blob):
+        self.blobs[key] = blob
+
+    def pop(self, key):
+        return self.blobs.pop(key)
+
+    def __contains__(self, key):
+        return key in self.blobs
+
+    def __len__(self):
+        return len(self.blobs)
+
+    def keys(self):
+        return list(self.blobs)
+
+    def stored_bytes(self):
+        return sum(len(blob) for blob in self.blobs.values())
+
+    def close(self):
+        self.blobs.clear()
+
+
+class MmapBlobStore:
+    """Hibernated room blobs appended to a local file and read through mmap"""
+
+    # Rewrite the file once dead space exceeds both this and the live data
+    COMPACT_THRESHOLD = 1 << 20
+
+    def __init__(self, path):
+        self.path = path
+        # Hibernated rooms do not outlive the process, just like live ones
+        self.file = open(path, 'w+b')
+        self.map = None
+        self.index = {}  # {key: (offset, length)}
+        self.size = 0
+        self.dead = 0
+
+    def put(self, key, blob):
+        if key in self.index:
+            self.dead += self.index[key][1]
+
+        self.file.seek(self.size)
+        self.file.write(blob)
+        self.file.flush()
+        self.index[key] = (self.size, len(blob))
+        self.size += len(blob)
+
+    def _read(self, offset, length):
+        if self.map is None or len(self.map) < offset + length:
+            if self.map is not None:
+                self.map.close()
+            self.map = mmap.mmap(self.file.fileno(), self.size, access=mmap.ACCESS_READ)
+        return self.map[offset:offset + length]
+
+    def pop(self, key):
+        offset, length = self.index.pop(key)
+        blob = self._read(offset, length)
+        self.dead += length
+
+        if self.dead > self.COMPACT_THRESHOLD and self.dead > self.size - self.dead:
+            self.compact()
+        return blob
+
+    def compact(self):
+        """Rewrite the file with live blobs only"""
+        blobs = {key: self._read(offset, length)
+                 for key, (offset, length) in self.index.items()}
+
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+        self.file = open(self.path, 'w+b')
+        self.index = {}
+        self.size = 0
+        self.dead = 0
+        for key, blob in blobs.items():
+            self.put(key, blob)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return list(self.index)
+
+    def stored_bytes(self):
+        return self.size - self.dead
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+
+class RoomHibernator:
+    """Moves idle rooms between the live registry and compressed blobs"""
+
+    def __init__(self, registry, restore, idle_timeout=120, storage='memory',
+                 path='hibernation.bin', compress_level=6):
+        self.registry = registry  # live rooms, {room_id: game}
+        self.restore = restore  # restore(snapshot) -> game
+        self.idle_timeout = idle_timeout
+        self.compress_level = compress_level
+        if storage == 'mmap':
+            self.store = MmapBlobStore(path)
+        else:
+            self.store = MemoryBlobStore()
+        self.meta = {}  # {room_id: (last_activity, seated socket IDs)} for hibernated rooms
+        self.lock = threading.RLock()
+        self.stats = {
+            'hibernations': 0,
+            'rehydrations': 0,
+            'raw_bytes': 0,
+            'compressed_bytes': 0
+        }
+        self.rehydrate_total = 0.0
+        self.rehydrate_max = 0.0
+        self.rehydrate_last = 0.0
+
+    def __contains__(self, room_id):
+        return room_id in self.meta
+
+    def hibernate(self, room_id, game):
+        """Serialize a live room and drop it from the registry"""
+        snapshot = game.to_snapshot()
+        raw = json.dumps(snapshot, separators=(',', ':')).encode('utf-8')
+        blob = zlib.compress(raw, self.compress_level)
+
+        with self.lock:
+            if self.registry.get(room_id) is not game:
+                return False
+            self.store.put(room_id, blob)
+            self.meta[room_id] = (game.last_activity, tuple(game.players))
+            del self.registry[room_id]
+
+            self.stats['hibernations'] += 1
+            self.stats['raw_bytes'] += len(raw)
+            self.stats['compressed_bytes'] += len(blob)
+        return True
+
+    def hibernate_idle(self, now=None, can_hibernate=None):
+        """Hibernate every room idle for longer than the timeout"""
+        if self.idle_timeout <= 0:
+            return 0
+
+        now = now or time.time()
+        hibernated = 0
+        for room_id, game in list(self.registry.items()):
+            if now - game.last_activity < self.idle_timeout:
+                continue
+
+            # Handlers change rooms under the same lock and check that the
+            # room is still live, so nothing is lost after the snapshot
+            with game.lock:
+                # Activity may have arrived since the scan started
+                if now - game.last_activity < self.idle_timeout:
+                    continue
+                if can_hibernate is not None and not can_hibernate(game):
+                    continue
+                if self.hibernate(room_id, game):
+                    hibernated += 1
+
+        if hibernated:
+            logger.info(f"Hibernated {hibernated} idle rooms ({len(self.meta)} hibernated in total)")
+        return hibernated
+
+    def rehydrate(self, room_id):
+        """Bring a hibernated room back into the registry and return it"""
+        with self.lock:
+            game = self.registry.get(room_id)
+            if game is not None or room_id not in self.meta:
+                return game
+
+            started = time.perf_counter()
+            blob = self.store.pop(room_id)
+            del self.meta[room_id]
+            game = self.restore(json.loads(zlib.decompress(blob)))
+            self.registry[room_id] = game
+            elapsed = time.perf_counter() - started
+
+            self.stats['rehydrations'] += 1
+            self.rehydrate_last = elapsed
+            self.rehydrate_total += elapsed
+            self.rehydrate_max = max(self.rehydrate_max, elapsed)
+
+        logger.debug(f"Rehydrated room {room_id} in {elapsed * 1000:.2f} ms")
+        return game
+
+    def expired(self, now, inactive_timeout, occupied=None):
+        """Hibernated rooms that are unoccupied and past the inactivity timeout
+
+        occupied(room_id, socket_ids) decides whether a room still has
+        players; by default any seated player counts.
+        """
+        occupied = occupied or (lambda room_id, socket_ids: bool(socket_ids))
+        with self.lock:
+            return [room_id for room_id, (last_activity, socket_ids) in self.meta.items()
+                    if now - last_activity > inactive_timeout and not occupied(room_id, socket_ids)]
+
+    def discard(self, room_id):
+        """Forget a hibernated room without rehydrating it"""
+        with self.lock:
+            if self.meta.pop(room_id, None) is not None:
+                self.store.pop(room_id)
+                return True
+            return False
+
+    def get_stats(self):
+        """Hibernated room count, storage size and rehydrate cost"""
+        with self.lock:
+            rehydrations = self.stats['rehydrations']
+            return {
+                'hibernated_rooms': len(self.meta),
+                'stored_bytes': self.store.stored_bytes(),
+                'storage': 'mmap' if isinstance(self.store, MmapBlobStore) else 'memory',
+                'idle_timeout': self.idle_timeout,
+                'rehydrate_last_ms': self.rehydrate_last * 1000,
+                'rehydrate_avg_ms': (self.rehydrate_total / rehydrations * 1000) if rehydrations else 0.0,
+                'rehydrate_max_ms': self.rehydrate_max * 1000,
+                **self.stats
+            }
@@ -0,0 +1,253 @@
+"""
+Persistent game history and leaderboard backed by local SQLite.
+
+Finished games are handed to a background writer through a bounded queue,
+so the pull_trigger path never touches the disk. The writer runs in WAL
+mode and inserts whole batches with executemany, updating the per-player
+and global aggregate tables in the same transaction. Leaderboard and
+statistics queries read those aggregates through indexes instead of
+scanning the games table.
+"""
+
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger('russian_roulette.history')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    room_id TEXT NOT NULL,
+    winner TEXT,
+    eliminated_player TEXT,
+    player_count INTEGER NOT NULL,
+    rounds INTEGER NOT NULL,
+    chambers INTEGER NOT NULL,
+    started_at REAL,
+    ended_at REAL NOT NULL,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS idx_games_ended_at ON games (ended_at);
+
+CREATE TABLE IF NOT EXISTS game_players (
+    game_id INTEGER NOT NULL,
+    player_name TEXT NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_game_players_name ON game_players (player_name, game_id);
+
+CREATE TABLE IF NOT EXISTS player_stats (
+    player_name TEXT PRIMARY KEY,
+    games_played INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    survivals INTEGER NOT NULL DEFAULT 0,
+    eliminations INTEGER NOT NULL DEFAULT 0,
+    last_played REAL
+);
+CREATE INDEX IF NOT EXISTS idx_player_stats_wins ON player_stats (wins DESC, survivals DESC);
+CREATE INDEX IF NOT EXISTS idx_player_stats_games ON player_stats (games_played DESC);
+CREATE INDEX IF NOT EXISTS idx_player_stats_survivals ON player_stats (survivals DESC);
+
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    games INTEGER NOT NULL DEFAULT 0,
+    rounds INTEGER NOT NULL DEFAULT 0,
+    total_duration REAL NOT NULL DEFAULT 0,
+    longest_game REAL NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO totals (id) VALUES (1);
+"""
+
+UPSERT_PLAYER_STATS = """
+INSERT INTO player_stats (player_name, games_played, wins, survivals, eliminations, last_played)
+VALUES (?, 1, ?, ?, ?, ?)
+ON CONFLICT (player_name) DO UPDATE SET
+    games_played = games_played + 1,
+    wins = wins + excluded.wins,
+    survivals = survivals + excluded.survivals,
+    eliminations = eliminations + excluded.eliminations,
+    last_played = MAX(COALESCE(last_played, 0), excluded.last_played)
+"""
+
+# Leaderboard orderings, each backed by an index on player_stats
+LEADERBOARD_ORDERS = {
+    'wins': 'wins DESC, survivals DESC',
+    'games': 'games_played DESC',
+    'survivals': 'survivals DESC'
+}
+
+
+def connect(path, readonly=False):
+    """Open a SQLite connection (sqlite3 is only imported when needed)"""
+    import sqlite3
+
+    if readonly:
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+class GameHistory:
+    """Batched SQLite writer plus leaderboard/statistics reads"""
+
+    def __init__(self, path, batch_size=500, flush_interval=1.0, max_pending=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.readers = threading.local()
+        self.stats = {
+            'recorded': 0,
+            'written': 0,
+            'batches': 0,
+            'dropped': 0,
+            'write_errors': 0
+        }
+        self.last_batch_ms = 0.0
+        self._stopping = threading.Event()
+        self._thread = None
+
+        # Create the schema up front so readers never see a missing table
+        connection = connect(path)
+        connection.executescript(SCHEMA)
+        connection.close()
+
+    def record(self, game_result):
+        """Queue a finished game for the writer; never blocks"""
+        try:
+            self.pending.put_nowait(game_result)
+            self.stats['recorded'] += 1
+        except queue.Full:
+            self.stats['dropped'] += 1
+            logger.warning(f"History queue full, dropped result of room {game_result['room_id']}")
+
+    def _write_batch(self, connection, batch):
+        games = []
+        players = []
+        stats = []
+        rounds = 0
+        duration = 0.0
+        longest = 0.0
+
+        next_id = connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM games").fetchone()[0]
+        for game_id, result in enumerate(batch, start=next_id):
+            game_duration = (result['ended_at'] - result['started_at']) if result.get('started_at') else None
+            games.append((
+                game_id, result['room_id'], result['winner'], result['eliminated_player'],
+                len(result['players']), result['rounds'], result['chambers'],
+                result.get('started_at'), result['ended_at'], game_duration
+            ))
+
+            survivors = [name for name in result['players'] if name != result['eliminated_player']]
+            for name in result['players']:
+                eliminated = name == result['eliminated_player']
+                won = not eliminated and len(survivors) == 1
+                outcome = 'eliminated' if eliminated else ('won' if won else 'survived')
+                players.append((game_id, name, outcome))
+                stats.append((name, int(won), int(not eliminated), int(eliminated), result['ended_at']))
+
+            rounds += result['rounds']
+            duration += game_duration or 0.0
+            longest = max(longest, game_duration or 0.0)
+
+        with connection:
+            connection.executemany(
+                "INSERT INTO games (id, room_id, winner, eliminated_player, player_count, "
+                "rounds, chambers, started_at, ended_at, duration) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                games)
+            connection.executemany(
+                "INSERT INTO game_players (game_id, player_name, outcome) VALUES (?, ?, ?)",
+                players)
+            connection.executemany(UPSERT_PLAYER_STATS, stats)
+            connection.execute(
+                "UPDATE totals SET games = games + ?, rounds = rounds + ?, "
+                "total_duration = total_duration + ?, longest_game = MAX(longest_game, ?) WHERE id = 1",
+                (len(games), rounds, duration, longest))
+
+    def run(self):
+        """Writer loop: gather a batch, then write it in one transaction"""
+        connection = connect(self.path)
+
+        while not (self._stopping.is_set() and self.pending.empty()):
+            try:
+                batch = [self.pending.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            # Give a burst a moment to accumulate, then take what is there
+            deadline = time.monotonic() + min(self.flush_interval, 0.1)
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.pending.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            started = time.perf_counter()
+            try:
+                self._write_batch(connection, batch)
+                self.stats['written'] += len(batch)
+                self.stats['batches'] += 1
+            except Exception as e:
+                self.stats['write_errors'] += 1
+                logger.error(f"Error writing game history batch: {str(e)}")
+            self.last_batch_ms = (time.perf_counter() - started) * 1000
+
+        connection.close()
+
+    def start(self):
+        """Start the writer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5):
+        """Flush whatever is queued and stop the writer"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _reader(self):
+        connection = getattr(self.readers, 'connection', None)
+        if connection is None:
+            connection = connect(self.path, readonly=True)
+            self.readers.connection = connection
+        return connection
+
+    def leaderboard(self, limit=10, order='wins'):
+        """Top players from the player_stats aggregate"""
+        order_by = LEADERBOARD_ORDERS.get(order, LEADERBOARD_ORDERS['wins'])
+        rows = self._reader().execute(
+            f"SELECT player_name, games_played, wins, survivals, eliminations, last_played "
+            f"FROM player_stats ORDER BY {order_by} LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    def player_stats(self, player_name):
+        """Aggregate statistics for one player, or None"""
+        row = self._reader().execute(
+            "SELECT player_name, games_played, wins, survivals, eliminations, last_played "
+            "FROM player_stats WHERE player_name = ?", (player_name,)).fetchone()
+        return dict(row) if row else None
+
+    def summary(self):
+        """Global totals across every recorded game"""
+        row = self._reader().execute(
+            "SELECT games, rounds, total_duration, longest_game FROM totals WHERE id = 1").fetchone()
+        summary = dict(row)
+        summary['average_rounds'] = summary['rounds'] / summary['games'] if summary['games'] else 0.0
+        summary['average_duration'] = summary['total_duration'] / summary['games'] if summary['games'] else 0.0
+        return summary
+
+    def get_stats(self):
+        """Writer queue depth and counters"""
+        return {
+            'pending': self.pending.qsize(),
+            'last_batch_ms': self.last_batch_ms,
+            **self.stats
+        }
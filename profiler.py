@@ -0,0 +1,156 @@
+"""
+On-demand profiling for the live server.
+
+Nothing runs until a session is requested. The sampler then walks the
+stack of every thread (socket workers, outbound workers, cleanup,
+hibernation, ...) through sys._current_frames() at a fixed interval and
+returns the counts as collapsed stacks, which flamegraph.pl and
+speedscope read directly. In 'cpu' mode only threads the kernel reports
+as running are counted. The memory mode takes two tracemalloc snapshots
+and returns the allocation sites that grew in between.
+
+Only one session runs at a time, whatever its mode.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+MODES = ('wall', 'cpu', 'memory')
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling session is already running"""
+
+
+def frame_label(frame):
+    """Collapsed-stack label of one frame"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def thread_running(native_id):
+    """Whether the kernel reports a thread as running (Linux only)"""
+    try:
+        with open(f"/proc/self/task/{native_id}/stat", 'rb') as f:
+            stat = f.read()
+    except OSError:
+        return False
+    # The state follows the parenthesized command name
+    return stat[stat.rindex(b')') + 2:stat.rindex(b')') + 3] == b'R'
+
+
+class Profiler:
+    """Single-session sampling profiler and tracemalloc differ"""
+
+    def __init__(self, interval=0.005, max_seconds=60):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.lock = threading.Lock()
+        self.active = None  # mode of the running session
+        self.stats = {
+            'sessions': 0,
+            'rejected': 0,
+            'last_samples': 0,
+            'last_duration': 0.0
+        }
+
+    def _acquire(self, mode, seconds):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"Duration must be between 0 and {self.max_seconds} seconds")
+        if mode == 'cpu' and not os.path.isdir('/proc/self/task'):
+            raise ValueError("CPU mode needs /proc (Linux)")
+
+        if not self.lock.acquire(blocking=False):
+            self.stats['rejected'] += 1
+            raise ProfilerBusy(f"A {self.active} profiling session is already running")
+        self.active = mode
+        self.stats['sessions'] += 1
+
+    def _release(self, samples, started):
+        self.stats['last_samples'] = samples
+        self.stats['last_duration'] = time.monotonic() - started
+        self.active = None
+        self.lock.release()
+
+    def sample(self, seconds, mode='wall'):
+        """Sample every thread for a while and return collapsed stacks"""
+        self._acquire(mode, seconds)
+        started = time.monotonic()
+        stacks = Counter()
+        samples = 0
+        own_ident = threading.get_ident()
+
+        try:
+            deadline = started + seconds
+            while time.monotonic() < deadline:
+                threads = {thread.ident: thread for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_ident:
+                        continue
+                    thread = threads.get(ident)
+                    if mode == 'cpu' and (thread is None or not thread_running(thread.native_id)):
+                        continue
+
+                    stack = []
+                    while frame is not None:
+                        stack.append(frame_label(frame))
+                        frame = frame.f_back
+                    stack.append(thread.name if thread is not None else f"thread-{ident}")
+                    stacks[';'.join(reversed(stack))] += 1
+                samples += 1
+                time.sleep(self.interval)
+        finally:
+            self._release(samples, started)
+
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def memory_diff(self, seconds, limit=30, group_by='lineno', frames=1):
+        """Allocation growth per source location over a time window"""
+        import tracemalloc
+
+        self._acquire('memory', seconds)
+        started = time.monotonic()
+        # Leave tracing on if it was enabled before (PYTHONTRACEMALLOC)
+        was_tracing = tracemalloc.is_tracing()
+
+        try:
+            if not was_tracing:
+                tracemalloc.start(frames)
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__),
+                      tracemalloc.Filter(False, __file__)]
+
+            before = tracemalloc.take_snapshot().filter_traces(ignore)
+            time.sleep(seconds)
+            after = tracemalloc.take_snapshot().filter_traces(ignore)
+            traced_current, traced_peak = tracemalloc.get_traced_memory()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+            self._release(2, started)
+
+        differences = after.compare_to(before, group_by)
+        return {
+            'seconds': seconds,
+            'traced_current': traced_current,
+            'traced_peak': traced_peak,
+            'top': [{
+                'location': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                'size_diff': stat.size_diff,
+                'count_diff': stat.count_diff,
+                'size': stat.size,
+                'count': stat.count
+            } for stat in differences[:limit]]
+        }
+
+    def get_stats(self):
+        """Current session and counters"""
+        return {
+            'active': self.active,
+            'interval': self.interval,
+            **self.stats
+        }
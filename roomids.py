@@ -0,0 +1,127 @@
+"""
+Compact, collision-checked room IDs.
+
+IDs use the Crockford Base32 alphabet (digits and upper-case letters
+without I, L, O and U), so they are short, case-insensitive and cannot be
+misread when shared aloud or typed from a screenshot. Each character
+carries 5 random bits; the default 6 characters give about a billion IDs.
+
+A pool of candidates is generated ahead of time by a background thread,
+so creating a room only pops an ID and checks it against the live
+registry. An optional fixed prefix lets several server shards allocate
+from disjoint ranges, so a router can pick the shard by the ID's prefix.
+"""
+
+import logging
+import secrets
+import threading
+from collections import deque
+
+logger = logging.getLogger('russian_roulette.roomids')
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+# Characters people type for the ones the alphabet leaves out
+CONFUSABLES = str.maketrans({'I': '1', 'L': '1', 'O': '0'})
+
+
+def normalize_room_id(room_id):
+    """Canonical form of a user-supplied room ID"""
+    return room_id.strip().upper().replace('-', '').translate(CONFUSABLES)
+
+
+class RoomIdAllocator:
+    """Hands out unused room IDs from a background-refilled pool"""
+
+    def __init__(self, is_live, length=6, prefix='', pool_size=256):
+        self.is_live = is_live  # is_live(room_id) -> True if the ID is taken
+        self.length = length
+        self.prefix = normalize_room_id(prefix)
+        if any(char not in ALPHABET for char in self.prefix):
+            raise ValueError(f"Room ID prefix must use the alphabet {ALPHABET}")
+
+        self.pool_size = pool_size
+        self.low_water = pool_size // 4
+        self.pool = deque()
+        self.pooled = set()
+        self.lock = threading.Lock()
+        self.refill_needed = threading.Event()
+        self.stats = {
+            'allocated': 0,
+            'collisions': 0,
+            'pool_misses': 0,
+            'generated': 0
+        }
+        self._thread = None
+
+    def generate(self):
+        """One random candidate ID"""
+        bits = secrets.randbits(5 * self.length)
+        chars = []
+        for _ in range(self.length):
+            chars.append(ALPHABET[bits & 31])
+            bits >>= 5
+        self.stats['generated'] += 1
+        return self.prefix + ''.join(chars)
+
+    def refill(self):
+        """Top the pool up to its full size"""
+        while len(self.pool) < self.pool_size:
+            room_id = self.generate()
+            with self.lock:
+                if room_id in self.pooled:
+                    continue
+                self.pooled.add(room_id)
+                self.pool.append(room_id)
+
+    def allocate(self):
+        """A room ID that is not currently live"""
+        while True:
+            with self.lock:
+                if self.pool:
+                    room_id = self.pool.popleft()
+                    self.pooled.discard(room_id)
+                else:
+                    room_id = None
+                if len(self.pool) < self.low_water:
+                    self.refill_needed.set()
+
+            if room_id is None:
+                # The refill thread fell behind (or is not running)
+                self.stats['pool_misses'] += 1
+                room_id = self.generate()
+
+            if self.is_live(room_id):
+                self.stats['collisions'] += 1
+                continue
+
+            self.stats['allocated'] += 1
+            return room_id
+
+    def run(self):
+        """Refill loop, woken when the pool drops below its low watermark"""
+        while True:
+            try:
+                self.refill()
+            except Exception as e:
+                logger.error(f"Error refilling room ID pool: {str(e)}")
+            self.refill_needed.wait()
+            self.refill_needed.clear()
+
+    def start(self):
+        """Start the refill thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def get_stats(self):
+        """Pool level and allocation counters"""
+        return {
+            'pooled': len(self.pool),
+            'pool_size': self.pool_size,
+            'id_length': len(self.prefix) + self.length,
+            'prefix': self.prefix,
+            'keyspace': len(ALPHABET) ** self.length,
+            **self.stats
+        }
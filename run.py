@@ -8,25 +8,26 @@ for real-time multiplayer functionality using threading mode.
 
 import os
 import sys
-from app import app, socketio
+from app import create_app, socketio, start_background_services
 
 def main():
     """Main function to run the Flask application with Socket.IO."""
 
+    app = create_app()
+
     print("🎯 Starting Russian Roulette Multiplayer Server...")
     print("=" * 60)
 
-    # Check if we're in development mode
-    debug_mode = os.environ.get('FLASK_DEBUG', 'True').lower() in ['true', '1', 'yes']
-
-    # Set host and port from environment or use defaults
-    host = os.environ.get('FLASK_HOST', '0.0.0.0')
-    port = int(os.environ.get('FLASK_PORT', 5000))
+    # Server settings come from config.py (overridable from the environment)
+    debug_mode = app.config['DEBUG']
+    host = app.config['HOST']
+    port = app.config['PORT']
 
+    print(f"Environment: {os.environ.get('FLASK_ENV', 'development')}")
     print(f"Debug Mode: {debug_mode}")
     print(f"Host: {host}")
     print(f"Port: {port}")
-    print(f"Socket.IO: Enabled")
+    print(f"Socket.IO: Enabled ({app.config['SOCKETIO_ASYNC_MODE']} mode)")
     print(f"Real-time Multiplayer: Ready")
     print("=" * 60)
     print(f"🌐 Application will be available at: http://localhost:{port}")
@@ -36,6 +37,12 @@ def main():
     print("Press Ctrl+C to stop the server")
     print()
 
+    # With the reloader on, this process only watches files and restarts
+    # the child that actually serves requests, so only the child needs
+    # the background services
+    if not debug_mode or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services(app)
+
     try:
         # Run the Flask application with Socket.IO
         socketio.run(
@@ -0,0 +1,135 @@
+"""
+Shared deadline scheduler for turn timeouts.
+
+One thread serves every room: deadlines live in a single min-heap keyed by
+room, so arming or re-arming a room's deadline is an O(log n) push instead
+of a threading.Timer (and a thread) per turn. Re-armed and cancelled
+deadlines are invalidated lazily and skipped when they reach the top of
+the heap; the heap is compacted when stale entries pile up.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger('russian_roulette.scheduler')
+
+
+class DeadlineScheduler:
+    """Min-heap of per-key deadlines served by a single thread"""
+
+    def __init__(self, callback, clock=time.monotonic):
+        self.callback = callback  # callback(key, data) runs on the scheduler thread
+        self.clock = clock
+        self.heap = []  # [(deadline, seq, key)]
+        self.active = {}  # {key: (deadline, seq, data)}
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.stats = {
+            'armed': 0,
+            'cancelled': 0,
+            'fired': 0,
+            'stale_skipped': 0,
+            'callback_errors': 0,
+            'compactions': 0
+        }
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self.lag_last = 0.0
+        self._thread = None
+
+    def arm(self, key, delay, data=None):
+        """Set (or replace) the deadline for key, delay seconds from now"""
+        deadline = self.clock() + delay
+        with self.condition:
+            seq = next(self.counter)
+            self.active[key] = (deadline, seq, data)
+            heapq.heappush(self.heap, (deadline, seq, key))
+            self.stats['armed'] += 1
+
+            if len(self.heap) > 64 and len(self.heap) > 2 * len(self.active):
+                self._compact()
+
+            # Only wake the thread if this is now the earliest deadline
+            if self.heap[0][1] == seq:
+                self.condition.notify()
+        return deadline
+
+    def cancel(self, key):
+        """Drop the deadline for key, if any"""
+        with self.condition:
+            if self.active.pop(key, None) is not None:
+                self.stats['cancelled'] += 1
+
+    def _compact(self):
+        self.heap = [(deadline, seq, key) for key, (deadline, seq, _) in self.active.items()]
+        heapq.heapify(self.heap)
+        self.stats['compactions'] += 1
+
+    def _next_due(self):
+        """Block until a live deadline is due and return it"""
+        with self.condition:
+            while True:
+                while self.heap:
+                    deadline, seq, key = self.heap[0]
+                    current = self.active.get(key)
+                    if current is None or current[1] != seq:
+                        # Re-armed or cancelled since this entry was pushed
+                        heapq.heappop(self.heap)
+                        self.stats['stale_skipped'] += 1
+                        continue
+                    break
+
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+
+                deadline, seq, key = self.heap[0]
+                now = self.clock()
+                if deadline > now:
+                    self.condition.wait(deadline - now)
+                    continue
+
+                heapq.heappop(self.heap)
+                _, _, data = self.active.pop(key)
+                return key, data, now - deadline
+
+    def run(self):
+        """Fire deadlines as they come due"""
+        while True:
+            key, data, lag = self._next_due()
+
+            self.stats['fired'] += 1
+            self.lag_last = lag
+            self.lag_total += lag
+            self.lag_max = max(self.lag_max, lag)
+
+            try:
+                self.callback(key, data)
+            except Exception as e:
+                self.stats['callback_errors'] += 1
+                logger.error(f"Error in deadline callback for {key}: {str(e)}")
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def get_stats(self):
+        """Pending deadlines, hit counts and scheduler lag"""
+        with self.condition:
+            next_in = self.heap[0][0] - self.clock() if self.heap else None
+            fired = self.stats['fired']
+            return {
+                'pending': len(self.active),
+                'heap_size': len(self.heap),
+                'next_deadline_in': next_in,
+                'lag_last_ms': self.lag_last * 1000,
+                'lag_avg_ms': (self.lag_total / fired * 1000) if fired else 0.0,
+                'lag_max_ms': self.lag_max * 1000,
+                **self.stats
+            }
@@ -122,6 +122,17 @@ def create_env_file():
             f.write("# Game Settings\n")
             f.write("MAX_PLAYERS=6\n")
             f.write("MIN_PLAYERS=2\n")
+            f.write("CHAMBER_COUNT=6\n")
+            f.write("\n")
+            f.write("# Capacity tuning (see config.py for every setting)\n")
+            f.write("# SOCKETIO_PING_INTERVAL=25\n")
+            f.write("# SOCKETIO_PING_TIMEOUT=20\n")
+            f.write("# SOCKETIO_MAX_HTTP_BUFFER_SIZE=1000000\n")
+            f.write("# ROOM_CLEANUP_INTERVAL=300\n")
+            f.write("# ROOM_INACTIVE_TIMEOUT=900\n")
+            f.write("# OUTBOUND_WORKERS=4\n")
+            f.write("# LOG_LEVEL=INFO\n")
+            f.write("# METRICS_ENABLED=True\n")
 
         print("✅ .env file created with default settings")
         return True
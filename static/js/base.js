@@ -0,0 +1,149 @@
+// Global Socket.IO connection, using the transports the server allows
+const socket = io(JSON.parse(document.body.dataset.socketOptions || "{}"));
+
+// Connection status management
+socket.on("connect", function () {
+    console.log("Connected to server with socket ID:", socket.id);
+    updateConnectionStatus(true);
+});
+
+socket.on("disconnect", function (reason) {
+    console.log("Disconnected from server");
+    updateConnectionStatus(false);
+
+    // A server-side disconnect is not retried automatically
+    if (reason === "io server disconnect" && upgradeRequired) {
+        upgradeRequired = false;
+        socket.connect();
+    }
+});
+
+// The server drops sessions that are still long-polling after the upgrade
+// deadline; come back over the transports it asks for
+let upgradeRequired = false;
+socket.on("upgrade_required", function (data) {
+    console.log("Reconnecting with transports:", data.transports);
+    upgradeRequired = true;
+    socket.io.opts.transports = data.transports;
+});
+
+// Debug all incoming Socket.IO events
+socket.onAny((eventName, ...args) => {
+    console.log(
+        "Received Socket.IO event:",
+        eventName,
+        "with data:",
+        args,
+    );
+});
+
+function updateConnectionStatus(connected) {
+    const statusEl = document.getElementById("connectionStatus");
+    if (connected) {
+        statusEl.textContent = "Connected";
+        statusEl.className = "connection-status connected";
+    } else {
+        statusEl.textContent = "Disconnected";
+        statusEl.className = "connection-status disconnected";
+    }
+}
+
+// Global message system
+function showMessage(message, type = "info") {
+    const messageDiv = document.createElement("div");
+    messageDiv.className = `message ${type}`;
+    messageDiv.textContent = message;
+
+    const container = document.querySelector(".card");
+    const firstChild =
+        container.querySelector("h1") || container.firstChild;
+    container.insertBefore(messageDiv, firstChild.nextSibling);
+
+    // Auto-remove after 5 seconds
+    setTimeout(() => {
+        if (messageDiv.parentNode) {
+            messageDiv.remove();
+        }
+    }, 5000);
+}
+
+// Global error handler
+socket.on("error", function (data) {
+    console.error("Socket error:", data);
+    showMessage(data.message || "An error occurred", "error");
+});
+
+// Utility functions
+function copyToClipboard(text) {
+    if (navigator.clipboard) {
+        navigator.clipboard
+            .writeText(text)
+            .then(function () {
+                showMessage("Copied to clipboard!", "success");
+            })
+            .catch(function (err) {
+                console.error("Could not copy text: ", err);
+                showMessage("Could not copy to clipboard", "error");
+            });
+    } else {
+        const textArea = document.createElement("textarea");
+        textArea.value = text;
+        document.body.appendChild(textArea);
+        textArea.select();
+        try {
+            document.execCommand("copy");
+            showMessage("Copied to clipboard!", "success");
+        } catch (err) {
+            console.error("Could not copy text: ", err);
+            showMessage("Could not copy to clipboard", "error");
+        }
+        document.body.removeChild(textArea);
+    }
+}
+
+function formatPlayerName(player) {
+    let name = player.name;
+    if (player.is_host) {
+        name += " [HOST]";
+    }
+    return name;
+}
+
+function getPlayerBadges(player, currentPlayerId, gameStarted) {
+    const badges = [];
+
+    if (player.is_host) {
+        badges.push('<span class="badge badge-host">HOST</span>');
+    }
+
+    if (gameStarted && player.id === currentPlayerId) {
+        badges.push(
+            '<span class="badge badge-current">YOUR TURN</span>',
+        );
+    }
+
+    if (!player.is_alive) {
+        badges.push(
+            '<span class="badge badge-eliminated">ELIMINATED</span>',
+        );
+    }
+
+    return badges.join("");
+}
+
+// Sound effects (simple beep simulation)
+function playSound(type) {
+    // You can implement actual sound effects here
+    console.log(`Sound: ${type}`);
+}
+
+// Revolver animation
+function spinRevolver() {
+    const revolver = document.querySelector(".revolver");
+    if (revolver) {
+        revolver.classList.add("spinning");
+        setTimeout(() => {
+            revolver.classList.remove("spinning");
+        }, 1000);
+    }
+}
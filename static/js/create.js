@@ -0,0 +1,134 @@
+let createdRoomId = null;
+
+function createRoom() {
+    const hostName = document.getElementById("hostName").value.trim();
+
+    if (!hostName) {
+        showMessage("Please enter your name", "error");
+        document.getElementById("hostName").focus();
+        return;
+    }
+
+    if (hostName.length > 20) {
+        showMessage("Name must be 20 characters or less", "error");
+        return;
+    }
+
+    // Show loading
+    showLoading(true);
+
+    // Disable create button
+    const createBtn = document.getElementById("createBtn");
+    createBtn.disabled = true;
+    createBtn.textContent = "Creating...";
+
+    // Emit create room event
+    socket.emit("create_room", {
+        player_name: hostName,
+    });
+}
+
+function copyRoomId() {
+    if (createdRoomId) {
+        copyToClipboard(createdRoomId);
+    }
+}
+
+function enterRoom() {
+    if (createdRoomId) {
+        window.location.href = `/room/${createdRoomId}`;
+    }
+}
+
+function createAnother() {
+    // Reset form
+    document.getElementById("hostName").value = "";
+    showLoading(false);
+    showSuccess(false);
+
+    // Re-enable create button
+    const createBtn = document.getElementById("createBtn");
+    createBtn.disabled = false;
+    createBtn.textContent = "Create Room";
+
+    // Focus on name input
+    document.getElementById("hostName").focus();
+}
+
+function showLoading(show) {
+    document.getElementById("loadingSection").style.display = show
+        ? "block"
+        : "none";
+}
+
+function showSuccess(show, roomId = null) {
+    const successSection = document.getElementById("successSection");
+    successSection.style.display = show ? "block" : "none";
+
+    if (show && roomId) {
+        createdRoomId = roomId;
+        document.getElementById("newRoomId").textContent = roomId;
+    }
+}
+
+// Socket event handlers
+socket.on("room_created", function (data) {
+    console.log("Room created successfully:", data);
+
+    // Needed to retake the seat from the room page
+    sessionStorage.setItem(`room_${data.room_id}_seat_token`, data.seat_token);
+
+    showLoading(false);
+    showSuccess(true, data.room_id);
+    showMessage(data.message, "success");
+
+    // Re-enable create button in case they want to create another
+    const createBtn = document.getElementById("createBtn");
+    createBtn.disabled = false;
+    createBtn.textContent = "Create Room";
+});
+
+socket.on("error", function (data) {
+    console.error("Error creating room:", data);
+
+    showLoading(false);
+    showSuccess(false);
+    showMessage(data.message || "Failed to create room", "error");
+
+    // Re-enable create button
+    const createBtn = document.getElementById("createBtn");
+    createBtn.disabled = false;
+    createBtn.textContent = "Create Room";
+});
+
+// Enter key handler
+document
+    .getElementById("hostName")
+    .addEventListener("keypress", function (e) {
+        if (e.key === "Enter") {
+            createRoom();
+        }
+    });
+
+// Auto-focus on name input when page loads
+window.addEventListener("load", function () {
+    document.getElementById("hostName").focus();
+    console.log("Create room page loaded");
+});
+
+// Keyboard shortcuts
+document.addEventListener("keydown", function (e) {
+    if (e.key === "Escape") {
+        window.location.href = "/";
+    }
+});
+
+// Form validation on input
+document.getElementById("hostName").addEventListener("input", function (e) {
+    const value = e.target.value;
+    const createBtn = document.getElementById("createBtn");
+
+    if (value.length > 20) {
+        showMessage("Name must be 20 characters or less", "warning");
+    }
+});
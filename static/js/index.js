@@ -0,0 +1,256 @@
+// Section visibility management
+function showCreateRoom() {
+    hideAllSections();
+    document.getElementById("createRoomSection").style.display = "block";
+    document.getElementById("createPlayerName").focus();
+}
+
+function showJoinRoom() {
+    hideAllSections();
+    document.getElementById("joinRoomSection").style.display = "block";
+    document.getElementById("joinRoomId").focus();
+}
+
+function showHowToPlay() {
+    hideAllSections();
+    document.getElementById("howToPlaySection").style.display = "block";
+}
+
+function hideAllSections() {
+    document.getElementById("createRoomSection").style.display = "none";
+    document.getElementById("joinRoomSection").style.display = "none";
+    document.getElementById("howToPlaySection").style.display = "none";
+    document.getElementById("loadingSection").style.display = "none";
+}
+
+function showLoading() {
+    hideAllSections();
+    document.getElementById("loadingSection").style.display = "block";
+}
+
+// Room creation
+function createRoom() {
+    const playerName = document
+        .getElementById("createPlayerName")
+        .value.trim();
+
+    if (!playerName) {
+        showMessage("Please enter your name", "error");
+        return;
+    }
+
+    if (playerName.length > 20) {
+        showMessage("Name must be 20 characters or less", "error");
+        return;
+    }
+
+    showLoading();
+
+    socket.emit("create_room", {
+        player_name: playerName,
+    });
+}
+
+// Room joining
+function joinRoom() {
+    const roomId = document
+        .getElementById("joinRoomId")
+        .value.trim()
+        .toUpperCase();
+
+    if (!roomId) {
+        showMessage("Please enter a room ID", "error");
+        return;
+    }
+
+    if (roomId.length < 4 || roomId.length > 12) {
+        showMessage("Room ID must be 4 to 12 characters", "error");
+        return;
+    }
+
+    // Simply redirect to the room page
+    window.location.href = `/room/${roomId}`;
+}
+
+// Socket event handlers
+socket.on("room_created", function (data) {
+    console.log("Room created:", data);
+    showMessage(data.message, "success");
+
+    // Store creator info temporarily for host recognition
+    sessionStorage.setItem(`room_${data.room_id}_creator`, "true");
+    sessionStorage.setItem(
+        `room_${data.room_id}_creator_name`,
+        document.getElementById("createPlayerName").value.trim(),
+    );
+    sessionStorage.setItem(
+        `room_${data.room_id}_creator_socket`,
+        socket.id,
+    );
+    // Needed to retake the seat from the room page
+    sessionStorage.setItem(`room_${data.room_id}_seat_token`, data.seat_token);
+
+    // Redirect directly to the room page
+    setTimeout(() => {
+        window.location.href = `/room/${data.room_id}`;
+    }, 1000);
+});
+
+socket.on("player_joined", function (data) {
+    console.log("Joined room:", data);
+    showMessage(data.message, "success");
+
+    // This shouldn't happen on index page, but just in case
+    hideAllSections();
+});
+
+// Error handling
+socket.on("error", function (data) {
+    console.error("Socket error:", data);
+    hideAllSections();
+    showMessage(data.message, "error");
+});
+
+// Enter key handlers
+document
+    .getElementById("createPlayerName")
+    .addEventListener("keypress", function (e) {
+        if (e.key === "Enter") {
+            createRoom();
+        }
+    });
+
+document
+    .getElementById("joinRoomId")
+    .addEventListener("keypress", function (e) {
+        if (e.key === "Enter") {
+            joinRoom();
+        }
+    });
+
+// Room ID input formatting (uppercase and length limit)
+document
+    .getElementById("joinRoomId")
+    .addEventListener("input", function (e) {
+        e.target.value = e.target.value
+            .toUpperCase()
+            .replace(/[^A-Z0-9]/g, "")
+            .slice(0, 12);
+    });
+
+// Auto-focus on sections
+function focusFirstInput() {
+    const createSection = document.getElementById("createRoomSection");
+    const joinSection = document.getElementById("joinRoomSection");
+
+    if (createSection.style.display === "block") {
+        document.getElementById("createPlayerName").focus();
+    } else if (joinSection.style.display === "block") {
+        document.getElementById("joinRoomId").focus();
+    }
+}
+
+// Add some interactive effects
+document.querySelector(".revolver").addEventListener("click", function () {
+    spinRevolver();
+    playSound("click");
+});
+
+// Keyboard shortcuts
+document.addEventListener("keydown", function (e) {
+    if (e.key === "Escape") {
+        hideAllSections();
+    }
+});
+
+// Helper function to enter room
+function enterRoom(roomId) {
+    window.location.href = `/room/${roomId}`;
+}
+
+// Tournament invites (/?tournament=<id>&player=<name>&seat=<secret>)
+let tournamentInvite = null;
+
+function goToTournamentRoom(nextRoom) {
+    // Take the reserved seat automatically on the room page
+    sessionStorage.setItem(`room_${nextRoom}_tournament_name`, tournamentInvite.player_name);
+    sessionStorage.setItem(`room_${nextRoom}_seat_token`, tournamentInvite.seat_token);
+    enterRoom(nextRoom);
+}
+
+function followTournament() {
+    socket.emit("join_tournament", tournamentInvite, function (response) {
+        if (!response || !response.success) {
+            showMessage(response ? response.message : "Failed to join tournament", "error");
+            tournamentInvite = null;
+            return;
+        }
+
+        if (response.finished) {
+            showMessage(
+                response.champion
+                    ? `${response.name}: ${response.champion} wins the tournament!`
+                    : `${response.name} is over`,
+                "success",
+            );
+        } else if (response.room_id) {
+            showMessage(`Round ${response.round}: you play in room ${response.room_id}`, "success");
+            goToTournamentRoom(response.room_id);
+        } else if (response.bye) {
+            showMessage(`Round ${response.round}: you have a bye, wait for the next round`, "info");
+        } else {
+            showMessage(`Waiting for the next round of ${response.name}`, "info");
+        }
+    });
+}
+
+socket.on("tournament_round", function (data) {
+    console.log("Tournament round:", data);
+
+    if (!tournamentInvite) {
+        return;
+    }
+
+    if (data.finished) {
+        showMessage(
+            data.champion
+                ? `${data.name}: ${data.champion} wins the tournament!`
+                : `${data.name} is over`,
+            "success",
+        );
+        return;
+    }
+
+    const nextRoom = data.assignments[tournamentInvite.player_name];
+    if (nextRoom) {
+        showMessage(`Round ${data.round}: you play in room ${nextRoom}`, "success");
+        setTimeout(() => goToTournamentRoom(nextRoom), 1000);
+    } else if (data.byes.includes(tournamentInvite.player_name)) {
+        showMessage(`Round ${data.round}: you have a bye, wait for the next round`, "info");
+    }
+});
+
+// Re-follow after a reconnect, which comes back with a new socket id
+socket.on("connect", function () {
+    if (tournamentInvite) {
+        followTournament();
+    }
+});
+
+// Initialize page
+window.addEventListener("load", function () {
+    console.log("Russian Roulette Multiplayer Lobby Loaded");
+    hideAllSections();
+
+    const params = new URLSearchParams(window.location.search);
+    if (params.get("tournament") && params.get("player") && params.get("seat")) {
+        tournamentInvite = {
+            tournament_id: params.get("tournament"),
+            player_name: params.get("player"),
+            seat_token: params.get("seat"),
+        };
+        if (socket.connected) {
+            followTournament();
+        }
+    }
+});
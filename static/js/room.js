@@ -0,0 +1,636 @@
+let gameState = null;
+let myPlayerId = null;
+let roomId = document.getElementById("roomId").dataset.roomId.toUpperCase();
+let hasJoined = false;
+let isHost = false;
+let myPlayerName = "";
+let isSpectating = false;
+
+// Join room functionality
+function joinRoomWithName() {
+    const playerName = document.getElementById("playerName").value.trim();
+
+    if (!playerName) {
+        showMessage("Please enter your name", "error");
+        return;
+    }
+
+    if (playerName.length > 20) {
+        showMessage("Name must be 20 characters or less", "error");
+        return;
+    }
+
+    myPlayerName = playerName;
+    isSpectating = false;
+    showLoadingOverlay(true);
+
+    joinAndSync(playerName);
+
+    console.log("Attempting to join room as:", playerName);
+}
+
+// Take (or retake) a seat and get the room state in a single round trip.
+// Retaking a seat needs the secret the server handed out for it.
+function joinAndSync(playerName) {
+    socket.emit(
+        "join_and_sync",
+        {
+            room_id: roomId.toUpperCase(),
+            player_name: playerName,
+            seat_token: sessionStorage.getItem(`room_${roomId}_seat_token`),
+        },
+        function (reply) {
+            if (!reply.success) {
+                showLoadingOverlay(false);
+                hasJoined = false;
+                showMessage(reply.message, "error");
+                if (reply.message.includes("Room not found")) {
+                    setTimeout(() => {
+                        window.location.href = "/";
+                    }, 2000);
+                }
+                return;
+            }
+
+            sessionStorage.setItem(`room_${roomId}_seat_token`, reply.seat_token);
+            updateGameUI(reply.game_state);
+            for (let player of reply.game_state.players) {
+                if (player.id === reply.player_id) {
+                    markJoined(player);
+                    break;
+                }
+            }
+            showMessage(reply.message, "success");
+        },
+    );
+}
+
+function markJoined(player) {
+    hasJoined = true;
+    myPlayerId = player.id;
+    isHost = player.is_host;
+    myPlayerName = player.name;
+    document.getElementById("joinModal").style.display = "none";
+    showLoadingOverlay(false);
+
+    // Force show the main game interface
+    document.getElementById("gameControls").style.display = "block";
+    document.querySelector(".players-section").style.display = "block";
+
+    console.log("I have joined the room as:", player.name, "isHost:", isHost);
+}
+
+function spectateRoom() {
+    isSpectating = true;
+    socket.emit("spectate_room", { room_id: roomId.toUpperCase() });
+}
+
+function goHome() {
+    if (hasJoined) {
+        socket.disconnect();
+    }
+    window.location.href = "/";
+}
+
+function copyRoomId() {
+    copyToClipboard(roomId);
+}
+
+function leaveRoom() {
+    if (confirm("Are you sure you want to leave the room?")) {
+        window.location.href = "/";
+    }
+}
+
+function showLoadingOverlay(show) {
+    document.getElementById("loadingOverlay").style.display = show
+        ? "block"
+        : "none";
+}
+
+// Game control functions
+function startGame() {
+    console.log("Attempting to start game. GameState:", gameState);
+    console.log("My player ID:", myPlayerId);
+    console.log("Host ID:", gameState ? gameState.host : "no gameState");
+
+    if (!gameState) {
+        showMessage("Game state not loaded yet", "error");
+        return;
+    }
+
+    if (!gameState.host || myPlayerId !== gameState.host) {
+        showMessage("Only the host can start the game", "error");
+        console.log(
+            "Not host. My ID:",
+            myPlayerId,
+            "Host ID:",
+            gameState.host,
+        );
+        return;
+    }
+
+    if (gameState.player_count < gameState.min_players) {
+        showMessage(
+            `Need at least ${gameState.min_players} players to start`,
+            "error",
+        );
+        return;
+    }
+
+    console.log("Starting game...");
+    socket.emit("start_game", { room_id: roomId.toUpperCase() });
+}
+
+function pullTrigger() {
+    if (
+        !gameState ||
+        !gameState.current_player ||
+        myPlayerId !== gameState.current_player.id
+    ) {
+        showMessage("It's not your turn!", "error");
+        return;
+    }
+
+    const btn = document.getElementById("pullTriggerBtn");
+    btn.disabled = true;
+    btn.textContent = "Pulling...";
+
+    spinRevolver();
+
+    setTimeout(() => {
+        socket.emit("pull_trigger", { room_id: roomId.toUpperCase() });
+    }, 1000);
+}
+
+function resetGame() {
+    if (!gameState || myPlayerId !== gameState.host) {
+        showMessage("Only the host can reset the game", "error");
+        return;
+    }
+
+    if (confirm("Are you sure you want to reset the game?")) {
+        socket.emit("reset_game", { room_id: roomId.toUpperCase() });
+    }
+}
+
+function playAgain() {
+    resetGame();
+}
+
+// UI update functions
+function updateGameUI(newGameState) {
+    console.log("Updating game UI with state:", newGameState);
+    gameState = newGameState;
+
+    if (gameState.players) {
+        for (let player of gameState.players) {
+            if (player.id === socket.id || player.name === myPlayerName) {
+                myPlayerId = player.id;
+                isHost = player.is_host;
+                console.log(
+                    `Found myself: ${player.name}, isHost: ${isHost}, socketId: ${player.id}`,
+                );
+                break;
+            }
+        }
+    }
+
+    document.getElementById("playerCount").textContent =
+        gameState.player_count;
+    document.getElementById("maxPlayers").textContent = gameState.max_players;
+    updatePlayersList();
+    updateGameControls();
+    updateGameStatus();
+
+    const waitingMsg = document.getElementById("waitingMessage");
+    if (gameState.player_count === 0) {
+        waitingMsg.textContent = "Waiting for players to join...";
+        waitingMsg.style.display = "block";
+    } else if (gameState.player_count === 1) {
+        waitingMsg.textContent = "Waiting for more players...";
+        waitingMsg.style.display = "block";
+    } else {
+        waitingMsg.style.display = "none";
+    }
+
+    console.log(
+        "Game UI updated. hasJoined:",
+        hasJoined,
+        "isHost:",
+        isHost,
+        "playerCount:",
+        gameState.player_count,
+    );
+}
+
+function updatePlayersList() {
+    const playersList = document.getElementById("playersList");
+
+    if (
+        !gameState ||
+        !gameState.players ||
+        gameState.players.length === 0
+    ) {
+        playersList.innerHTML =
+            '<p style="text-align: center; color: #666; font-style: italic;">No players in room</p>';
+        return;
+    }
+
+    const playersHtml = gameState.players
+        .map((player) => {
+            let itemClass = "player-item";
+            let badges = [];
+
+            if (player.is_host) {
+                itemClass += " host";
+                badges.push('<span class="badge badge-host">HOST</span>');
+            }
+
+            if (
+                gameState.game_started &&
+                gameState.current_player &&
+                player.id === gameState.current_player.id
+            ) {
+                itemClass += " current-turn";
+                badges.push(
+                    '<span class="badge badge-current">YOUR TURN</span>',
+                );
+            }
+
+            if (!player.is_alive) {
+                itemClass += " eliminated";
+                badges.push(
+                    '<span class="badge badge-eliminated">ELIMINATED</span>',
+                );
+            }
+
+            return `
+            <div class="${itemClass}" data-player-id="${player.id}">
+                <div class="player-info">
+                    <div class="player-name">${player.name}</div>
+                    <div class="player-status">${player.is_alive ? "Alive" : "Eliminated"}</div>
+                </div>
+                <div class="player-badges">
+                    ${badges.join("")}
+                </div>
+            </div>
+        `;
+        })
+        .join("");
+
+    playersList.innerHTML = playersHtml;
+}
+
+function updateGameControls() {
+    const preGameControls = document.getElementById("preGameControls");
+    const inGameControls = document.getElementById("inGameControls");
+    const gameOverScreen = document.getElementById("gameOverScreen");
+    const startBtn = document.getElementById("startGameBtn");
+    const pullTriggerBtn = document.getElementById("pullTriggerBtn");
+    const resetBtn = document.getElementById("resetGameBtn");
+
+    if (gameState.is_game_over) {
+        preGameControls.style.display = "none";
+        inGameControls.style.display = "none";
+        gameOverScreen.style.display = "block";
+
+        if (myPlayerId === gameState.host) {
+            resetBtn.style.display = "inline-block";
+        }
+    } else if (gameState.game_started) {
+        preGameControls.style.display = "none";
+        inGameControls.style.display = "block";
+        gameOverScreen.style.display = "none";
+
+        pullTriggerBtn.disabled =
+            !gameState.current_player ||
+            myPlayerId !== gameState.current_player.id;
+        pullTriggerBtn.textContent = "Pull Trigger";
+
+        resetBtn.style.display =
+            myPlayerId === gameState.host ? "inline-block" : "none";
+    } else {
+        preGameControls.style.display = "block";
+        inGameControls.style.display = "none";
+        gameOverScreen.style.display = "none";
+
+        console.log(
+            "Updating start button. IsHost:",
+            isHost,
+            "PlayerCount:",
+            gameState.player_count,
+        );
+        startBtn.disabled =
+            !isHost || gameState.player_count < gameState.min_players;
+        startBtn.textContent = isHost
+            ? gameState.player_count >= gameState.min_players
+                ? "Start Game"
+                : "Need More Players"
+            : "Waiting for Host";
+    }
+}
+
+function updateGameStatus() {
+    const gameStatus = document.getElementById("gameStatus");
+    const currentChamber = document.getElementById("currentChamber");
+    const currentPlayerName = document.getElementById("currentPlayerName");
+
+    if (gameState.game_started && !gameState.is_game_over) {
+        gameStatus.style.display = "block";
+        currentChamber.textContent = gameState.current_chamber;
+        document.getElementById("totalChambers").textContent =
+            gameState.total_chambers;
+        currentPlayerName.textContent = gameState.current_player
+            ? gameState.current_player.name
+            : "-";
+    } else {
+        gameStatus.style.display = "none";
+    }
+}
+
+// Socket event handlers
+socket.on("player_joined", function (data) {
+    console.log("Player joined event received:", data);
+
+    if (data.game_state) {
+        // Always update game UI for all players
+        updateGameUI(data.game_state);
+
+        // Check if this event is about me joining
+        if (data.game_state.players) {
+            for (let player of data.game_state.players) {
+                if (
+                    player.id === socket.id ||
+                    player.name === myPlayerName
+                ) {
+                    markJoined(player);
+                    break;
+                }
+            }
+        }
+    } else {
+        console.log("No game state in player_joined event");
+    }
+
+    showMessage(data.message, "success");
+});
+
+socket.on("spectator_state", function (data) {
+    if (!isSpectating || hasJoined || !data.game_state) {
+        return;
+    }
+
+    document.getElementById("joinModal").style.display = "none";
+    updateGameUI(data.game_state);
+
+    // Spectators only watch, they never get game controls
+    document.getElementById("gameControls").style.display = "none";
+});
+
+socket.on("player_left", function (data) {
+    console.log("Player left:", data);
+    showMessage(data.message, "warning");
+    updateGameUI(data.game_state);
+});
+
+socket.on("game_started", function (data) {
+    console.log("Game started:", data);
+    showMessage(data.message, "success");
+    updateGameUI(data.game_state);
+    playSound("gameStart");
+});
+
+socket.on("trigger_result", function (data) {
+    console.log("Trigger result:", data);
+
+    const btn = document.getElementById("pullTriggerBtn");
+    btn.disabled = false;
+    btn.textContent = "Pull Trigger";
+
+    if (data.result_data && data.result_data.result === "bullet") {
+        showMessage(data.message, "error");
+        document.getElementById("gameOverTitle").textContent = "Game Over!";
+        document.getElementById("gameOverMessage").innerHTML = `
+            <strong>${data.result_data.eliminated_player} got the bullet!</strong><br>
+            <span style="color: #27ae60; font-size: 1.1em;">Winner: ${data.result_data.winner}</span>
+        `;
+        playSound("gameOver");
+    } else {
+        showMessage(data.message, "success");
+        playSound("empty");
+    }
+
+    updateGameUI(data.game_state);
+});
+
+socket.on("turn_timeout", function (data) {
+    console.log("Turn timed out:", data);
+    showMessage(data.message, "warning");
+    updateGameUI(data.game_state);
+});
+
+socket.on("game_reset", function (data) {
+    console.log("Game reset:", data);
+    showMessage(data.message, "info");
+    updateGameUI(data.game_state);
+});
+
+socket.on("tournament_round", function (data) {
+    console.log("Tournament round:", data);
+
+    if (data.finished) {
+        showMessage(
+            data.champion
+                ? `${data.name}: ${data.champion} wins the tournament!`
+                : `${data.name} is over`,
+            "success",
+        );
+        return;
+    }
+
+    const nextRoom = data.assignments[myPlayerName];
+    if (nextRoom) {
+        showMessage(`Round ${data.round}: you play in room ${nextRoom}`, "success");
+        // Take the reserved seat automatically on the next page; the
+        // tournament secret is the same in every round
+        sessionStorage.setItem(`room_${nextRoom}_tournament_name`, myPlayerName);
+        sessionStorage.setItem(
+            `room_${nextRoom}_seat_token`,
+            sessionStorage.getItem(`room_${roomId}_seat_token`),
+        );
+        setTimeout(() => {
+            window.location.href = `/room/${nextRoom}`;
+        }, 3000);
+    } else if (data.byes.includes(myPlayerName)) {
+        showMessage(`Round ${data.round}: you have a bye, wait for the next round`, "info");
+        // Wait in the lobby, which keeps following the tournament after this
+        // room is gone
+        const invite = new URLSearchParams({
+            tournament: data.tournament_id,
+            player: myPlayerName,
+            seat: sessionStorage.getItem(`room_${roomId}_seat_token`) || "",
+        });
+        setTimeout(() => {
+            window.location.href = `/?${invite}`;
+        }, 3000);
+    } else {
+        showMessage(`Round ${data.round} of ${data.name} has started`, "info");
+    }
+});
+
+socket.on("game_state_update", function (data) {
+    console.log("Game state update:", data);
+
+    if (data.game_state) {
+        updateGameUI(data.game_state);
+
+        if (data.game_state.players && data.game_state.players.length > 0) {
+            let foundMyself = false;
+            for (let player of data.game_state.players) {
+                if (
+                    player.id === socket.id ||
+                    (myPlayerName && player.name === myPlayerName)
+                ) {
+                    foundMyself = true;
+                    hasJoined = true;
+                    myPlayerId = player.id;
+                    isHost = player.is_host;
+                    myPlayerName = player.name;
+                    document.getElementById("joinModal").style.display =
+                        "none";
+
+                    // Force show the main game interface
+                    document.getElementById("gameControls").style.display =
+                        "block";
+                    document.querySelector(
+                        ".players-section",
+                    ).style.display = "block";
+
+                    console.log(
+                        "Found myself in room:",
+                        player.name,
+                        "isHost:",
+                        isHost,
+                    );
+                    break;
+                }
+            }
+
+            if (!foundMyself && !hasJoined) {
+                console.log("Not in room yet, showing join modal");
+                document.getElementById("joinModal").style.display =
+                    "block";
+            }
+        } else if (!hasJoined) {
+            document.getElementById("joinModal").style.display = "block";
+        }
+    } else if (!hasJoined) {
+        document.getElementById("joinModal").style.display = "block";
+    }
+});
+
+socket.on("error", function (data) {
+    console.error("Socket error:", data);
+    showLoadingOverlay(false);
+    showMessage(data.message, "error");
+
+    if (data.message.includes("Room not found")) {
+        setTimeout(() => {
+            window.location.href = "/";
+        }, 2000);
+    }
+});
+
+document
+    .getElementById("playerName")
+    .addEventListener("keypress", function (e) {
+        if (e.key === "Enter") {
+            joinRoomWithName();
+        }
+    });
+
+document.addEventListener("keydown", function (e) {
+    if (hasJoined && gameState) {
+        if (
+            e.code === "Space" &&
+            gameState.game_started &&
+            !gameState.is_game_over &&
+            gameState.current_player &&
+            myPlayerId === gameState.current_player.id
+        ) {
+            e.preventDefault();
+            pullTrigger();
+        }
+    }
+});
+
+// After a dropped connection (e.g. a server restart) retake the seat and
+// resync the state in one round trip
+socket.on("connect", function () {
+    if (hasJoined && myPlayerName && !isSpectating) {
+        joinAndSync(myPlayerName);
+    }
+});
+
+window.addEventListener("load", function () {
+    console.log("Room page loaded for room:", roomId);
+    document.getElementById("roomId").textContent = roomId;
+
+    // Tournament invites carry the player's seat secret in the link
+    const inviteToken = new URLSearchParams(window.location.search).get("seat");
+    if (inviteToken) {
+        sessionStorage.setItem(`room_${roomId}_seat_token`, inviteToken);
+        history.replaceState(null, "", window.location.pathname);
+    }
+
+    // Check if I'm the room creator
+    const isCreator =
+        sessionStorage.getItem(`room_${roomId}_creator`) === "true";
+    const creatorName = sessionStorage.getItem(
+        `room_${roomId}_creator_name`,
+    );
+    const creatorSocket = sessionStorage.getItem(
+        `room_${roomId}_creator_socket`,
+    );
+
+    const tournamentName = sessionStorage.getItem(
+        `room_${roomId}_tournament_name`,
+    );
+
+    if (tournamentName) {
+        console.log("Taking my tournament seat in room:", roomId);
+        myPlayerName = tournamentName;
+        showLoadingOverlay(true);
+        document.getElementById("joinModal").style.display = "none";
+        sessionStorage.removeItem(`room_${roomId}_tournament_name`);
+        joinAndSync(tournamentName);
+    } else if (isCreator && creatorName && creatorSocket === socket.id) {
+        console.log("I am the creator of this room:", roomId);
+        // Auto-join as creator/host
+        myPlayerName = creatorName;
+        showLoadingOverlay(true);
+        document.getElementById("joinModal").style.display = "none";
+
+        joinAndSync(creatorName);
+
+        // Clean up session storage
+        sessionStorage.removeItem(`room_${roomId}_creator`);
+        sessionStorage.removeItem(`room_${roomId}_creator_name`);
+        sessionStorage.removeItem(`room_${roomId}_creator_socket`);
+    } else {
+        // Show join modal for non-creators
+        document.getElementById("joinModal").style.display = "block";
+
+        // Check if room exists and get current state
+        setTimeout(() => {
+            socket.emit("get_game_state", {
+                room_id: roomId.toUpperCase(),
+            });
+        }, 100);
+    }
+});
+
+window.addEventListener("beforeunload", function (e) {
+    // The server will automatically handle disconnection
+});
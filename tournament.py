@@ -0,0 +1,253 @@
+"""
+Tournament mode: many concurrent rooms advancing survivors round by round.
+
+A tournament seeds its players into rooms in one pass. Every seat is
+reserved for a named player, and all rooms of a round play at the same
+time. Each room is indexed by ID, so a finished room is resolved in O(1):
+its survivors are appended to the round's advancing list and the round's
+pending counter drops. When the counter reaches zero, the next round is
+seeded in bulk. One batch message carrying every assignment goes to all
+participants, instead of one emit per player.
+
+The bracket lives here rather than in the rooms, so it is unaffected by
+room cleanup and hibernation.
+"""
+
+import itertools
+import logging
+import random
+import secrets
+import threading
+import time
+
+logger = logging.getLogger('russian_roulette.tournament')
+
+
+class Tournament:
+    """Bracket state of one tournament"""
+
+    def __init__(self, tournament_id, name, players, room_size):
+        self.id = tournament_id
+        self.name = name
+        self.players = list(players)
+        self.room_size = room_size
+        self.rounds = []  # [{'rooms': {room_id: [names]}, 'pending', 'advancing', 'byes', 'eliminated'}]
+        self.sockets = {}  # {player_name: socket_id} of seated or watching participants
+        # {player_name: secret}, required to take a reserved seat in any round
+        self.seat_tokens = {name: secrets.token_urlsafe(16) for name in self.players}
+        self.champion = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def current_round(self):
+        return self.rounds[-1] if self.rounds else None
+
+    def assignments(self):
+        """{player_name: room_id} for the current round"""
+        return {name: room_id
+                for room_id, names in self.current_round['rooms'].items()
+                for name in names}
+
+    def summary(self):
+        """Public view of the bracket"""
+        return {
+            'tournament_id': self.id,
+            'name': self.name,
+            'players': len(self.players),
+            'room_size': self.room_size,
+            'round': len(self.rounds),
+            'rooms_pending': self.current_round['pending'] if self.rounds else 0,
+            'remaining': sum(len(names) for names in self.current_round['rooms'].values()) +
+            len(self.current_round['byes']) if self.rounds else 0,
+            'assignments': self.assignments() if self.rounds and not self.champion else {},
+            'byes': self.current_round['byes'] if self.rounds else [],
+            'champion': self.champion,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'rounds': [{
+                'rooms': len(round_state['rooms']),
+                'pending': round_state['pending'],
+                'advancing': len(round_state['advancing']),
+                'eliminated': round_state['eliminated']
+            } for round_state in self.rounds]
+        }
+
+
+class TournamentManager:
+    """Creates tournaments and advances them as their rooms finish"""
+
+    def __init__(self, create_room, notify, max_players=500, retention=3600):
+        self.create_room = create_room  # create_room(room_size) -> room_id of a new, empty room
+        self.notify = notify  # notify(tournament, event, payload) sends one batch
+        self.max_players = max_players
+        self.retention = retention  # seconds a finished tournament is kept
+        self.tournaments = {}  # {tournament_id: Tournament}
+        self.room_index = {}  # {room_id: (tournament, round_number)} for unfinished rooms
+        self.reservations = {}  # {room_id: set(player_name)}
+        self.ids = itertools.count(1)
+        self.lock = threading.RLock()
+        self.stats = {
+            'created': 0,
+            'rooms_seeded': 0,
+            'rooms_finished': 0,
+            'rounds_advanced': 0,
+            'finished': 0,
+            'evicted': 0
+        }
+
+    def create(self, name, player_names, room_size):
+        """Register a tournament and seed its first round"""
+        names = list(dict.fromkeys(name.strip() for name in player_names if name.strip()))
+        if len(names) < 2:
+            raise ValueError("A tournament needs at least 2 distinct players")
+        if len(names) > self.max_players:
+            raise ValueError(f"A tournament can have at most {self.max_players} players")
+        if any(len(player_name) > 20 for player_name in names):
+            raise ValueError("Player names must be 20 characters or less")
+        if room_size < 2:
+            raise ValueError("Tournament rooms need at least 2 seats")
+
+        with self.lock:
+            tournament = Tournament(f"T{next(self.ids)}", name or 'Tournament', names, room_size)
+            self.tournaments[tournament.id] = tournament
+            self._seed_round(tournament, names)
+            self.stats['created'] += 1
+
+        logger.info(f"Tournament {tournament.id} created with {len(names)} players "
+                    f"in {len(tournament.current_round['rooms'])} rooms")
+        return tournament
+
+    def _seed_round(self, tournament, names):
+        names = list(names)
+        random.shuffle(names)
+
+        # Spread players evenly; a player left alone gets a bye
+        room_count = -(-len(names) // tournament.room_size)
+        groups = [names[index::room_count] for index in range(room_count)]
+        byes = [group[0] for group in groups if len(group) == 1]
+
+        round_number = len(tournament.rounds) + 1
+        rooms = {}
+        for group in groups:
+            if len(group) == 1:
+                continue
+            room_id = self.create_room(len(group))
+            rooms[room_id] = group
+            self.room_index[room_id] = (tournament, round_number)
+            self.reservations[room_id] = set(group)
+
+        tournament.rounds.append({
+            'rooms': rooms,
+            'pending': len(rooms),
+            'advancing': byes,
+            'byes': list(byes),
+            'eliminated': []
+        })
+        self.stats['rooms_seeded'] += len(rooms)
+
+    def reserved(self, room_id):
+        """Names allowed to sit in a tournament room, or None for normal rooms"""
+        return self.reservations.get(room_id)
+
+    def seat_token(self, room_id, player_name):
+        """The secret a player needs to take their reserved seat in a room"""
+        entry = self.room_index.get(room_id)
+        return entry[0].seat_tokens.get(player_name) if entry is not None else None
+
+    def holds(self, room_id):
+        """Whether a room is part of a round that has not finished yet"""
+        return room_id in self.room_index
+
+    def watch(self, tournament, player_name, socket_id):
+        """Send round announcements for a player to a socket outside any room
+
+        Players with a bye (or between rounds) have no seat, so without this
+        nothing would tell them their next room.
+        """
+        with self.lock:
+            tournament.sockets[player_name] = socket_id
+
+    def seated(self, room_id, player_name, socket_id):
+        """Remember a participant's socket for round announcements"""
+        entry = self.room_index.get(room_id)
+        if entry is not None:
+            entry[0].sockets[player_name] = socket_id
+            return entry[0]
+        return None
+
+    def room_finished(self, room_id, seated_names, eliminated_name):
+        """Advance the survivors of a finished room; O(1) unless the round ends
+
+        Seeded players who never took their seat are out, like the one
+        who got the bullet.
+        """
+        with self.lock:
+            entry = self.room_index.pop(room_id, None)
+            if entry is None:
+                return None
+            tournament, round_number = entry
+            self.reservations.pop(room_id, None)
+            round_state = tournament.rounds[round_number - 1]
+
+            seeded = round_state['rooms'][room_id]
+            survivors = [name for name in seeded if name in seated_names and name != eliminated_name]
+            round_state['advancing'].extend(survivors)
+            round_state['eliminated'].extend(name for name in seeded if name not in survivors)
+            round_state['pending'] -= 1
+            self.stats['rooms_finished'] += 1
+
+            if round_state['pending'] > 0:
+                return None
+            return self._advance(tournament, round_state)
+
+    def _advance(self, tournament, round_state):
+        advancing = round_state['advancing']
+        if len(advancing) <= 1:
+            tournament.champion = advancing[0] if advancing else None
+            tournament.finished_at = time.time()
+            self.stats['finished'] += 1
+            logger.info(f"Tournament {tournament.id} finished, champion: {tournament.champion}")
+        else:
+            self._seed_round(tournament, advancing)
+            self.stats['rounds_advanced'] += 1
+            logger.info(f"Tournament {tournament.id} advanced to round {len(tournament.rounds)} "
+                        f"with {len(advancing)} players")
+
+        payload = {
+            'tournament_id': tournament.id,
+            'name': tournament.name,
+            'round': len(tournament.rounds),
+            'assignments': {} if tournament.champion or not advancing else tournament.assignments(),
+            'byes': [] if tournament.champion else tournament.current_round['byes'],
+            'eliminated': round_state['eliminated'],
+            'champion': tournament.champion,
+            'finished': tournament.finished_at is not None
+        }
+        self.notify(tournament, 'tournament_round', payload)
+        return payload
+
+    def prune(self, now=None):
+        """Forget tournaments (and their seat secrets) finished longer ago than the retention"""
+        now = now or time.time()
+        with self.lock:
+            expired = [tournament_id for tournament_id, tournament in self.tournaments.items()
+                       if tournament.finished_at is not None and now - tournament.finished_at > self.retention]
+            for tournament_id in expired:
+                del self.tournaments[tournament_id]
+            self.stats['evicted'] += len(expired)
+        return len(expired)
+
+    def get(self, tournament_id):
+        """A tournament by ID, or None"""
+        return self.tournaments.get(tournament_id)
+
+    def get_stats(self):
+        """Tournament and bracket counters"""
+        return {
+            'tournaments': len(self.tournaments),
+            'active': sum(1 for tournament in self.tournaments.values()
+                          if tournament.finished_at is None),
+            'rooms_in_play': len(self.room_index),
+            **self.stats
+        }
@@ -0,0 +1,138 @@
+"""
+Lightweight request-scoped tracing for socket handlers and the game engine.
+
+A socket handler opens a root span, and only a sampled fraction of
+handlers actually start a trace. Nested spans (room lookup, engine
+methods, state building, fan-out) attach to the trace that is active on
+the current thread. Finished spans go into a bounded ring buffer and can
+be exported in the Chrome trace event format, which chrome://tracing and
+Perfetto open directly.
+
+When a handler is not sampled, every span is one shared no-op object, so
+tracing costs a random() call per handler and an attribute lookup per
+span.
+"""
+
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+
+class NullSpan:
+    """Span used when the current handler is not being traced"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def annotate(self, **args):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    """One timed section of a sampled trace"""
+
+    __slots__ = ('tracer', 'stack', 'name', 'trace_id', 'args', 'start')
+
+    def __init__(self, tracer, stack, name, trace_id, args):
+        self.tracer = tracer
+        self.stack = stack
+        self.name = name
+        self.trace_id = trace_id
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.stack.pop()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.spans.append((self.name, self.trace_id, self.start, end - self.start,
+                                  threading.get_ident(), self.args))
+        return False
+
+    def annotate(self, **args):
+        """Attach extra arguments (room ID, result, ...) to the span"""
+        self.args.update(args)
+
+
+class Tracer:
+    """Sampled span recorder with a ring buffer of finished spans"""
+
+    def __init__(self, sample_rate=0.0, buffer_size=10000):
+        self.sample_rate = sample_rate
+        self.spans = deque(maxlen=buffer_size)
+        self.local = threading.local()
+        self.trace_ids = itertools.count(1)
+        self.stats = {
+            'traces_started': 0,
+            'exports': 0
+        }
+
+    def trace(self, name, **args):
+        """Root span for a handler, sampled at the configured rate"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return NULL_SPAN
+
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        if stack:
+            # Already inside a trace (a handler calling another one)
+            return Span(self, stack, name, stack[-1].trace_id, args)
+
+        self.stats['traces_started'] += 1
+        return Span(self, stack, name, next(self.trace_ids), args)
+
+    def span(self, name, **args):
+        """Child span of the trace active on this thread, if any"""
+        stack = getattr(self.local, 'stack', None)
+        if not stack:
+            return NULL_SPAN
+        return Span(self, stack, name, stack[-1].trace_id, args)
+
+    def chrome_trace(self):
+        """Buffered spans as a Chrome trace event document"""
+        pid = os.getpid()
+        events = [{
+            'name': name,
+            'cat': 'trace',
+            'ph': 'X',
+            'ts': start / 1000,
+            'dur': duration / 1000,
+            'pid': pid,
+            'tid': tid,
+            'args': dict(args, trace_id=trace_id)
+        } for name, trace_id, start, duration, tid, args in list(self.spans)]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path):
+        """Write the buffered spans to a Chrome trace JSON file"""
+        document = self.chrome_trace()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, separators=(',', ':'))
+        self.stats['exports'] += 1
+        return len(document['traceEvents'])
+
+    def get_stats(self):
+        """Sampling rate and ring buffer usage"""
+        return {
+            'sample_rate': self.sample_rate,
+            'buffered_spans': len(self.spans),
+            'buffer_size': self.spans.maxlen,
+            **self.stats
+        }
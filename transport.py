@@ -0,0 +1,108 @@
+"""
+Socket.IO transport policy and long-polling accounting.
+
+By default a Socket.IO session starts on HTTP long-polling and upgrades
+to a WebSocket later. Every poll is a full HTTP request through Werkzeug
+and the Flask request machinery. The policy picks between:
+
+- 'websocket': clients open a WebSocket straight away, with no polling
+  handshake at all.
+- 'polling': the default handshake, where sessions must upgrade within
+  an upgrade deadline or get disconnected and told to reconnect over
+  WebSocket only.
+
+TransportMeter sits in front of the Engine.IO WSGI middleware. It counts
+handshakes per transport, upgrades, and the requests and bytes that go
+over long-polling, so the effect of the policy can be measured.
+"""
+
+import logging
+import threading
+from urllib.parse import parse_qs
+
+logger = logging.getLogger('russian_roulette.transport')
+
+# Engine.IO transports allowed by each policy, in the order clients try them
+TRANSPORT_POLICIES = {
+    'websocket': ['websocket'],
+    'polling': ['polling', 'websocket']
+}
+
+
+def client_options(policy):
+    """Options for io() on the client for a transport policy"""
+    return {
+        'transports': TRANSPORT_POLICIES[policy],
+        'upgrade': policy == 'polling'
+    }
+
+
+class CountingBody:
+    """Response iterable that adds the bytes it yields to a counter"""
+
+    def __init__(self, body, meter):
+        self.body = body
+        self.meter = meter
+
+    def __iter__(self):
+        for chunk in self.body:
+            self.meter.add('polling_bytes_out', len(chunk))
+            yield chunk
+
+    def close(self):
+        if hasattr(self.body, 'close'):
+            self.body.close()
+
+
+class TransportMeter:
+    """WSGI middleware counting Engine.IO handshakes and polling traffic"""
+
+    def __init__(self, wsgi_app, path='/socket.io'):
+        self.wsgi_app = wsgi_app
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats = {
+            'polling_handshakes': 0,
+            'websocket_handshakes': 0,
+            'upgrades': 0,
+            'polling_requests': 0,
+            'polling_bytes_in': 0,
+            'polling_bytes_out': 0,
+            'missed_upgrade_deadline': 0
+        }
+
+    def add(self, counter, value=1):
+        with self.lock:
+            self.stats[counter] += value
+
+    def __call__(self, environ, start_response):
+        if not environ.get('PATH_INFO', '').startswith(self.path):
+            return self.wsgi_app(environ, start_response)
+
+        query = parse_qs(environ.get('QUERY_STRING', ''))
+        transport = query.get('transport', [''])[0]
+        has_session = 'sid' in query
+
+        if transport == 'websocket':
+            self.add('upgrades' if has_session else 'websocket_handshakes')
+            return self.wsgi_app(environ, start_response)
+        if transport != 'polling':
+            return self.wsgi_app(environ, start_response)
+
+        if not has_session:
+            self.add('polling_handshakes')
+        self.add('polling_requests')
+        try:
+            self.add('polling_bytes_in', int(environ.get('CONTENT_LENGTH') or 0))
+        except ValueError:
+            pass
+        return CountingBody(self.wsgi_app(environ, start_response), self)
+
+    def get_stats(self):
+        """Handshake, upgrade and polling traffic counters"""
+        with self.lock:
+            stats = dict(self.stats)
+        handshakes = stats['polling_handshakes'] + stats['websocket_handshakes']
+        stats['polling_handshake_ratio'] = (stats['polling_handshakes'] / handshakes
+                                            if handshakes else 0.0)
+        return stats